@@ -7,38 +7,90 @@ from typing import TYPE_CHECKING
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .api_client import PreHdoApiClient
-from .const import CONF_RECEIVER_COMMAND_ID
-from .coordinator import PreHdoCoordinator
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    CONF_PERIOD_MINUTES,
+    CONF_PERIOD_NAME,
+    CONF_PERIODS,
+    CONF_RECEIVER_COMMAND_ID,
+    CONF_RECEIVER_COMMAND_IDS,
+    DOMAIN,
+)
+from .coordinator import PreHdoReceivers
+from .hub import async_close_hub, async_get_hub
+from .services import async_setup_services
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.CALENDAR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-type PreHdoConfigEntry = ConfigEntry[PreHdoCoordinator]
+type PreHdoConfigEntry = ConfigEntry[PreHdoReceivers]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:  # noqa: ARG001
+    """Set up the PRE Distribuce HDO services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: PreHdoConfigEntry) -> bool:
     """Set up PRE Distribuce HDO from a config entry."""
-    session = async_get_clientsession(hass)
-    client = PreHdoApiClient(session=session)
-    command_id = entry.data[CONF_RECEIVER_COMMAND_ID]
+    hub = await async_get_hub(hass)
+
+    run_minutes = {
+        appliance[CONF_PERIOD_NAME]: appliance[CONF_PERIOD_MINUTES]
+        for appliance in entry.options.get(CONF_PERIODS, [])
+    }
 
-    coordinator = PreHdoCoordinator(hass, client, command_id)
-    await coordinator.async_config_entry_first_refresh()
+    receivers = PreHdoReceivers(
+        hass, hub, entry.data[CONF_RECEIVER_COMMAND_IDS], run_minutes
+    )
+    entry.async_on_unload(receivers.async_shutdown)
+    receivers.async_setup(entry)
 
-    entry.runtime_data = coordinator
+    entry.runtime_data = receivers
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def async_migrate_entry(hass: HomeAssistant, entry: PreHdoConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    if entry.version > 2:  # noqa: PLR2004
+        # Downgraded from a future version
+        return False
+
+    if entry.version == 1:
+        # Entries track a list of receivers since version 2
+        data = {CONF_RECEIVER_COMMAND_IDS: [entry.data[CONF_RECEIVER_COMMAND_ID]]}
+        hass.config_entries.async_update_entry(entry, data=data, version=2)
+        _LOGGER.debug("Migrated config entry %s to version 2", entry.entry_id)
+
+    return True
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: PreHdoConfigEntry) -> None:
+    """Reload the entry when the configured appliances change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: PreHdoConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok and not [
+        other
+        for other in hass.config_entries.async_loaded_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ]:
+        # The last entry closes the shared HTTP session
+        await async_close_hub(hass)
+    return unload_ok
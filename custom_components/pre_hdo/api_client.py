@@ -2,28 +2,111 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
-from datetime import UTC, datetime
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from typing import TYPE_CHECKING
 
-from aiohttp import ClientError, ClientSession
+from aiohttp import ClientError, ClientResponseError, ClientSession, ClientTimeout
 
-from .const import HDO_ONE_DAY_URL
-from .parser import HdoPeriod, parse_hdo_periods
+from .const import HDO_ONE_DAY_URL, MAX_CONCURRENT_REQUESTS
+from .metrics import ClientMetrics
+from .parser import HdoPeriod, scan_hdo_periods
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
 
 _LOGGER = logging.getLogger(__name__)
 
-REQUEST_TIMEOUT = 30
+REQUEST_TIMEOUT = ClientTimeout(total=30, connect=10, sock_read=20)
+
+# Consecutive failures after which requests fail fast until a backoff passes
+FAILURE_THRESHOLD = 3
+BACKOFF_BASE = 60  # seconds
+BACKOFF_MAX = 3600
 
 
 class PreHdoApiError(Exception):
     """Error communicating with PRE Distribuce API."""
 
 
+def backoff_delay(attempt: int) -> float:
+    """Return the jittered exponential delay in seconds before a retry.
+
+    The attempt counts from 0. The delay is drawn from the upper half of the
+    exponential step, so retries of several receivers do not line up.
+    """
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** min(attempt, 16))
+    return random.uniform(delay / 2, delay)  # noqa: S311
+
+
+class CircuitBreaker:
+    """Stops requests to an endpoint that keeps failing.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens for a
+    backoff delay, which grows with every further failure. Once it passes,
+    requests are let through again and the first success closes it.
+    """
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self._open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests should not be made."""
+        return time.monotonic() < self._open_until
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until requests are let through again."""
+        return max(0.0, self._open_until - time.monotonic())
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        self.failures += 1
+        if self.failures >= FAILURE_THRESHOLD:
+            delay = backoff_delay(self.failures - FAILURE_THRESHOLD)
+            self._open_until = time.monotonic() + delay
+
+
+@dataclass
+class HdoBatchResult:
+    """Outcome of a multi-day fetch, with per-day error isolation."""
+
+    # Parsed periods of the days whose payload was not known
+    periods: dict[date, list[HdoPeriod]] = field(default_factory=dict)
+    errors: dict[date, PreHdoApiError] = field(default_factory=dict)
+    # Payload digest of every fetched day, also the unchanged ones
+    digests: dict[date, bytes] = field(default_factory=dict)
+
+
 class PreHdoApiClient:
     """Async client for the PRE Distribuce HDO AJAX API."""
 
-    def __init__(self, session: ClientSession) -> None:
+    def __init__(
+        self,
+        session: ClientSession,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        url: str = HDO_ONE_DAY_URL,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
         self._session = session
+        self._url = url
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Passed in to keep the circuit state across clients of one endpoint
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = ClientMetrics()
 
     async def async_get_hdo_periods(
         self, command_id: str, date_str: str | None = None
@@ -38,7 +121,28 @@ class PreHdoApiClient:
             List of HdoPeriod for the requested day.
 
         Raises:
-            PreHdoApiError: On HTTP or parsing errors.
+            PreHdoApiError: On HTTP or parsing errors, or without a request
+                while the circuit breaker is open.
+
+        """
+        _digest, periods = await self.async_get_hdo_day(command_id, date_str)
+        return periods or []
+
+    async def async_get_hdo_day(
+        self,
+        command_id: str,
+        date_str: str | None = None,
+        known_digest: bytes | None = None,
+    ) -> tuple[bytes, list[HdoPeriod] | None]:
+        """Fetch a day's payload and parse it, unless its digest is known.
+
+        Returns the digest of the payload and its periods, or None instead of
+        the periods if the digest equals ``known_digest``. Callers keep what
+        they built from a payload under its digest, so the client keeps no
+        parsed periods itself.
+
+        Raises:
+            PreHdoApiError: As async_get_hdo_periods.
 
         """
         if date_str is None:
@@ -51,23 +155,136 @@ class PreHdoApiClient:
             "povelTitle": command_id,
         }
 
+        if self.breaker.is_open:
+            self.metrics.errors["circuit_open"] += 1
+            msg = (
+                "PRE Distribuce is failing, not retrying for "
+                f"{self.breaker.retry_in:.0f} s"
+            )
+            raise PreHdoApiError(msg)
+
+        self.metrics.requests += 1
+        started = time.perf_counter()
         try:
             async with self._session.post(
-                HDO_ONE_DAY_URL,
+                self._url,
                 data=data,
                 timeout=REQUEST_TIMEOUT,
             ) as resp:
                 resp.raise_for_status()
-                result = await resp.json(content_type=None)
-        except ClientError as err:
+                body = await resp.read()
+        except (ClientError, TimeoutError) as err:
+            self.breaker.record_failure()
+            if isinstance(err, TimeoutError):
+                self.metrics.errors["timeout"] += 1
+            elif isinstance(err, ClientResponseError):
+                self.metrics.errors["http"] += 1
+            else:
+                self.metrics.errors["connection"] += 1
             msg = f"Error fetching HDO data: {err}"
             raise PreHdoApiError(msg) from err
-        except (ValueError, KeyError) as err:
-            msg = f"Invalid response from PRE Distribuce: {err}"
-            raise PreHdoApiError(msg) from err
 
-        html = result.get("html", "")
-        return parse_hdo_periods(html)
+        fetch_ms = (time.perf_counter() - started) * 1000
+        self.metrics.fetch_ms.observe(fetch_ms)
+        self.metrics.bytes_received += len(body)
+        _LOGGER.debug(
+            "Fetched HDO data for %s on %s: %d bytes in %.1f ms",
+            command_id,
+            date_str,
+            len(body),
+            fetch_ms,
+        )
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == known_digest:
+            self.metrics.payload_cache_hits += 1
+            self.breaker.record_success()
+            return digest, None
+
+        self.metrics.payload_cache_misses += 1
+        started = time.perf_counter()
+        try:
+            periods = self._parse_response(command_id, date_str, body)
+        except PreHdoApiError:
+            # Error pages served with status 200 during maintenance
+            self.metrics.errors["invalid_response"] += 1
+            self.breaker.record_failure()
+            raise
+        parse_ms = (time.perf_counter() - started) * 1000
+        self.metrics.parse_ms.observe(parse_ms)
+        _LOGGER.debug(
+            "Parsed %d HDO periods for %s on %s in %.2f ms",
+            len(periods),
+            command_id,
+            date_str,
+            parse_ms,
+        )
+        self.breaker.record_success()
+        return digest, periods
+
+    def _parse_response(
+        self, command_id: str, date_str: str, body: bytes
+    ) -> list[HdoPeriod]:
+        """Parse periods straight from the raw JSON response body."""
+        result = scan_hdo_periods(body)
+        if not result.periods:
+            # Nothing found in the raw body, decode the envelope to tell an
+            # empty schedule from an invalid response
+            try:
+                html = json.loads(body).get("html", "")
+            except (ValueError, AttributeError) as err:
+                msg = f"Invalid response from PRE Distribuce: {err}"
+                raise PreHdoApiError(msg) from err
+            result = scan_hdo_periods(html)
+
+        for issue in result.issues:
+            _LOGGER.warning(
+                "Skipped HDO element for %s on %s at offset %d: %s",
+                command_id,
+                date_str,
+                issue.offset,
+                issue.message,
+            )
+        return result.periods
+
+    async def async_get_hdo_periods_batch(
+        self,
+        command_id: str,
+        days: Iterable[date],
+        known_digests: Mapping[date, bytes] | None = None,
+    ) -> HdoBatchResult:
+        """Fetch HDO periods for several days concurrently.
+
+        At most ``max_concurrency`` requests of this client are in flight at
+        once. A failing day is recorded in ``errors`` and does not affect the
+        other days. Days whose payload matches their known digest are not
+        parsed and only appear in ``digests``.
+        """
+        known_digests = known_digests or {}
+
+        async def _fetch(day: date) -> tuple[bytes, list[HdoPeriod] | None]:
+            async with self._semaphore:
+                return await self.async_get_hdo_day(
+                    command_id, day.strftime("%d.%m.%Y"), known_digests.get(day)
+                )
+
+        days = list(days)
+        results = await asyncio.gather(
+            *(_fetch(day) for day in days), return_exceptions=True
+        )
+
+        batch = HdoBatchResult()
+        for day, result in zip(days, results, strict=True):
+            if isinstance(result, PreHdoApiError):
+                batch.errors[day] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                digest, periods = result
+                batch.digests[day] = digest
+                if periods is not None:
+                    batch.periods[day] = periods
+        return batch
 
     async def async_validate_command_id(self, command_id: str) -> bool:
         """Validate that a receiver command ID returns HDO data."""
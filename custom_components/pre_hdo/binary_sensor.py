@@ -8,10 +8,16 @@ from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
 )
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import slugify
 
-from .const import CONF_RECEIVER_COMMAND_ID, DOMAIN
-from .coordinator import HdoData, PreHdoCoordinator
+from .const import DOMAIN
+from .coordinator import PreHdoCoordinator
+from .parser import HdoSchedule, periods_as_dicts
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -20,36 +26,66 @@ if TYPE_CHECKING:
     from . import PreHdoConfigEntry
 
 
-def can_appliance_run(data: HdoData, minutes_needed: int) -> bool:
-    """Check if an appliance can complete within the current low tariff window."""
-    if not data.is_low_tariff:
-        return False
-    return minutes_needed < data.minutes_to_high_tariff
-
-
 async def async_setup_entry(
-    hass: HomeAssistant,  # noqa: ARG001
+    hass: HomeAssistant,
     entry: PreHdoConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up binary sensors from a config entry."""
-    coordinator = entry.runtime_data
-    command_id = entry.data[CONF_RECEIVER_COMMAND_ID]
+    entities: list[BinarySensorEntity] = []
+    for command_id, coordinator in entry.runtime_data.coordinators.items():
+        entities.append(HdoTariffBinarySensor(coordinator, command_id))
+        entities.extend(
+            HdoApplianceBinarySensor(coordinator, command_id, name, minutes)
+            for name, minutes in coordinator.run_minutes.items()
+        )
+    _async_remove_stale_appliances(hass, entry)
+    async_add_entities(entities)
 
-    async_add_entities(
-        [
-            HdoTariffBinarySensor(coordinator, command_id),
-        ]
-    )
 
+def appliance_unique_id(command_id: str, name: str) -> str:
+    """Return the unique ID of an appliance sensor, shared by similar names."""
+    return f"pre-hdo_{command_id}_appliance_{slugify(name)}"
 
-class HdoTariffBinarySensor(CoordinatorEntity[PreHdoCoordinator], BinarySensorEntity):
+
+@callback
+def _async_remove_stale_appliances(
+    hass: HomeAssistant, entry: PreHdoConfigEntry
+) -> None:
+    """Remove the registry entries of appliances no longer configured."""
+    coordinators = entry.runtime_data.coordinators
+    prefixes = tuple(appliance_unique_id(command_id, "") for command_id in coordinators)
+    unique_ids = {
+        appliance_unique_id(command_id, name)
+        for command_id, coordinator in coordinators.items()
+        for name in coordinator.run_minutes
+    }
+    registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity.unique_id.startswith(prefixes) and entity.unique_id not in unique_ids:
+            registry.async_remove(entity.entity_id)
+
+
+async def _async_restore_is_on(entity: RestoreEntity) -> bool | None:
+    """Return the last known on/off state of an entity, if any."""
+    if (last := await entity.async_get_last_state()) is None:
+        return None
+    if last.state not in (STATE_ON, STATE_OFF):
+        return None
+    return last.state == STATE_ON
+
+
+class HdoTariffBinarySensor(
+    CoordinatorEntity[PreHdoCoordinator], BinarySensorEntity, RestoreEntity
+):
     """Binary sensor showing whether low tariff is currently active."""
 
     _attr_device_class = BinarySensorDeviceClass.POWER
     _attr_icon = "mdi:flash"
     _attr_has_entity_name = True
     _attr_translation_key = "low_tariff"
+    # Available on demand through the get_schedule service instead
+    _unrecorded_attributes = frozenset({"periods_today"})
 
     def __init__(
         self,
@@ -63,12 +99,41 @@ class HdoTariffBinarySensor(CoordinatorEntity[PreHdoCoordinator], BinarySensorEn
             "name": f"PRE Distribuce HDO {command_id}",
             "manufacturer": "PREdistribuce, a.s.",
         }
+        self._periods_source: HdoSchedule | None = None
+        self._periods_today: list[dict[str, str]] = []
+        self._last_written: (
+            tuple[bool, bool | None, str | None, HdoSchedule | None] | None
+        ) = None
+        self._restored_is_on: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known state, shown until the coordinator has data."""
+        await super().async_added_to_hass()
+        self._restored_is_on = await _async_restore_is_on(self)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the state or the schedule changed.
+
+        The attributes only derive from these, so minute ticks write nothing.
+        """
+        data = self.coordinator.data
+        state = (
+            self.available,
+            self.is_on,
+            data.current_tariff if data is not None else None,
+            data.schedule if data is not None else None,
+        )
+        if state == self._last_written:
+            return
+        self._last_written = state
+        self.async_write_ha_state()
 
     @property
     def is_on(self) -> bool | None:
         """Return True if low tariff is active."""
         if self.coordinator.data is None:
-            return None
+            return self._restored_is_on
         return self.coordinator.data.is_low_tariff
 
     @property
@@ -77,15 +142,67 @@ class HdoTariffBinarySensor(CoordinatorEntity[PreHdoCoordinator], BinarySensorEn
         data = self.coordinator.data
         if data is None:
             return {}
+        # Serialise the periods only when the schedule changed
+        if data.schedule is not self._periods_source:
+            self._periods_source = data.schedule
+            self._periods_today = periods_as_dicts(data.periods)
         return {
             "current_tariff": data.current_tariff,
-            "minutes_to_next_change": data.minutes_to_next_change,
-            "periods_today": [
-                {
-                    "tariff": p.tariff,
-                    "start": p.start.strftime("%H:%M"),
-                    "end": p.end.strftime("%H:%M"),
-                }
-                for p in data.periods
-            ],
+            "periods_today": self._periods_today,
+        }
+
+
+class HdoApplianceBinarySensor(
+    CoordinatorEntity[PreHdoCoordinator], BinarySensorEntity, RestoreEntity
+):
+    """Binary sensor showing whether an appliance can run now in low tariff.
+
+    The coordinator evaluates all appliances of the receiver in one pass,
+    this entity only reads its own result.
+    """
+
+    _attr_icon = "mdi:timer-check-outline"
+    _attr_has_entity_name = True
+    _attr_translation_key = "appliance"
+
+    def __init__(
+        self,
+        coordinator: PreHdoCoordinator,
+        command_id: str,
+        name: str,
+        minutes: int,
+    ) -> None:
+        super().__init__(coordinator)
+        self._appliance = name
+        self._attr_unique_id = appliance_unique_id(command_id, name)
+        self._attr_translation_placeholders = {"appliance": name}
+        self._attr_extra_state_attributes = {"minutes_needed": minutes}
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, command_id)},
+            "name": f"PRE Distribuce HDO {command_id}",
+            "manufacturer": "PREdistribuce, a.s.",
         }
+        self._last_written: tuple[bool, bool | None] | None = None
+        self._restored_is_on: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known state and join the coordinator's minute tick."""
+        await super().async_added_to_hass()
+        self._restored_is_on = await _async_restore_is_on(self)
+        self.async_on_remove(self.coordinator.async_track_minute_ticks())
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if it changed."""
+        state = (self.available, self.is_on)
+        if state == self._last_written:
+            return
+        self._last_written = state
+        self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the appliance would finish before high tariff."""
+        if self.coordinator.data is None:
+            return self._restored_is_on
+        return self.coordinator.data.appliances.get(self._appliance, False)
@@ -0,0 +1,135 @@
+"""Calendar platform for PRE Distribuce HDO."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, TARIFF_HIGH, TARIFF_LOW
+from .coordinator import PreHdoCoordinator, timeline_datetime, timeline_minute
+from .parser import minute_of_day
+
+if TYPE_CHECKING:
+    from datetime import date, datetime
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from . import PreHdoConfigEntry
+    from .parser import HdoTimeline
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,  # noqa: ARG001
+    entry: PreHdoConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up calendar entities from a config entry."""
+    async_add_entities(
+        HdoTariffCalendar(coordinator, command_id, tariff)
+        for command_id, coordinator in entry.runtime_data.coordinators.items()
+        for tariff in (TARIFF_LOW, TARIFF_HIGH)
+    )
+
+
+def timeline_events(
+    timeline: HdoTimeline, today: date, start: int, end: int, tariff: str
+) -> list[CalendarEvent]:
+    """Return the blocks of a tariff overlapping the minutes [start, end).
+
+    Consecutive periods of the same tariff, also across midnight, form one
+    event.
+    """
+    return [
+        CalendarEvent(
+            start=timeline_datetime(today, timeline.starts[i]),
+            end=timeline_datetime(today, timeline.ends[i]),
+            summary=tariff,
+        )
+        for i in timeline.blocks_between(start, end)
+        if timeline.tariffs[i] == tariff
+    ]
+
+
+class HdoTariffCalendar(CoordinatorEntity[PreHdoCoordinator], CalendarEntity):
+    """Calendar of the low or high tariff windows of the cached schedule.
+
+    Events are answered from the coordinator's stitched timeline, so range
+    queries never fetch and only visit the blocks inside the range.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: PreHdoCoordinator,
+        command_id: str,
+        tariff: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._tariff = tariff
+        if tariff == TARIFF_LOW:
+            self._attr_translation_key = "low_tariff"
+            self._attr_icon = "mdi:calendar-clock"
+        else:
+            self._attr_translation_key = "high_tariff"
+            self._attr_icon = "mdi:calendar-alert"
+            self._attr_entity_registry_enabled_default = False
+        self._attr_unique_id = f"pre-hdo_{command_id}_{tariff.lower()}_calendar"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, command_id)},
+            "name": f"PRE Distribuce HDO {command_id}",
+            "manufacturer": "PREdistribuce, a.s.",
+        }
+        self._last_written: tuple[bool, CalendarEvent | None] | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the current or next event changed."""
+        state = (self.available, self.event)
+        if state == self._last_written:
+            return
+        self._last_written = state
+        self.async_write_ha_state()
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next event of the tariff."""
+        now = dt_util.now()
+        today = now.date()
+        if today not in self.coordinator.days:
+            return None
+        timeline = self.coordinator.async_get_timeline(today)
+        if not timeline.ends:
+            return None
+        for i in timeline.blocks_between(minute_of_day(now), timeline.ends[-1]):
+            if timeline.tariffs[i] == self._tariff:
+                return CalendarEvent(
+                    start=timeline_datetime(today, timeline.starts[i]),
+                    end=timeline_datetime(today, timeline.ends[i]),
+                    summary=self._tariff,
+                )
+        return None
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,  # noqa: ARG002
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list[CalendarEvent]:
+        """Return the events of the tariff within a datetime range."""
+        today = dt_util.now().date()
+        if today not in self.coordinator.days:
+            return []
+        timeline = self.coordinator.async_get_timeline(today)
+        return timeline_events(
+            timeline,
+            today,
+            timeline_minute(today, start_date),
+            timeline_minute(today, end_date, round_up=True),
+            self._tariff,
+        )
@@ -3,14 +3,27 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+import re
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.config_entries import ConfigFlow, ConfigFlowResult, OptionsFlow
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import slugify
 
-from .api_client import PreHdoApiClient
-from .const import CONF_RECEIVER_COMMAND_ID, DOMAIN
+from .const import (
+    CONF_PERIOD_MINUTES,
+    CONF_PERIOD_NAME,
+    CONF_PERIODS,
+    CONF_RECEIVER_COMMAND_ID,
+    CONF_RECEIVER_COMMAND_IDS,
+    DOMAIN,
+)
+from .hub import async_get_hub
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,39 +33,177 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+# Entries with more receivers are titled by their count
+MAX_TITLE_COMMAND_IDS = 3
+
+
+def parse_command_ids(value: str) -> list[str]:
+    """Split user input into distinct command IDs, keeping their order."""
+    return list(dict.fromkeys(c for c in re.split(r"[\s,;]+", value) if c))
+
+
+def appliance_name_error(name: str, appliances: list[dict[str, Any]]) -> str | None:
+    """Return the error key for a new appliance name, if it cannot be added.
+
+    Appliance entities are identified by the slug of the name, so names
+    that only differ in case or punctuation are the same appliance.
+    """
+    slug = slugify(name)
+    if not slug:
+        return "invalid_appliance_name"
+    if any(slugify(a[CONF_PERIOD_NAME]) == slug for a in appliances):
+        return "appliance_exists"
+    return None
+
+
+def _entry_title(command_ids: list[str]) -> str:
+    """Return the title of an entry tracking the command IDs."""
+    if len(command_ids) > MAX_TITLE_COMMAND_IDS:
+        return f"PRE Distribuce HDO ({len(command_ids)} receivers)"
+    return f"PRE Distribuce HDO {', '.join(command_ids)}"
+
+
+STEP_ADD_APPLIANCE_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PERIOD_NAME): str,
+        vol.Required(CONF_PERIOD_MINUTES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=24 * 60)
+        ),
+    }
+)
+
 
 class PreHdoConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for PRE Distribuce."""
 
-    VERSION = 1
+    VERSION = 2
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> PreHdoOptionsFlow:  # noqa: ARG004
+        """Return the options flow handler."""
+        return PreHdoOptionsFlow()
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle the initial step."""
         errors: dict[str, str] = {}
+        placeholders: dict[str, str] = {}
 
         if user_input is not None:
-            command_id = user_input[CONF_RECEIVER_COMMAND_ID].strip()
+            command_ids = parse_command_ids(user_input[CONF_RECEIVER_COMMAND_ID])
+            configured = {
+                command_id
+                for entry in self._async_current_entries(include_ignore=False)
+                for command_id in entry.data.get(CONF_RECEIVER_COMMAND_IDS, [])
+            }
+            if configured.intersection(command_ids):
+                return self.async_abort(reason="already_configured")
 
-            # Check if already configured with this command ID
-            await self.async_set_unique_id(f"pre-hdo_{command_id}")
-            self._abort_if_unique_id_configured()
+            invalid = command_ids
+            if command_ids:
+                # Check if already configured with these command IDs
+                await self.async_set_unique_id(f"pre-hdo_{'_'.join(command_ids)}")
+                self._abort_if_unique_id_configured()
 
-            # Validate the command ID against the API
-            session = async_get_clientsession(self.hass)
-            client = PreHdoApiClient(session=session)
-            valid = await client.async_validate_command_id(command_id)
+                # Validate the command IDs through the shared hub, which keeps
+                # the fetched schedules for the first refresh of the entry
+                hub = await async_get_hub(self.hass)
+                results = await hub.async_validate_command_ids(command_ids)
+                invalid = [c for c, valid in results.items() if not valid]
 
-            if valid:
-                return self.async_create_entry(
-                    title=f"PRE Distribuce HDO {command_id}",
-                    data={CONF_RECEIVER_COMMAND_ID: command_id},
-                )
-            errors["base"] = "invalid_command_id"
+                if not invalid:
+                    return self.async_create_entry(
+                        title=_entry_title(command_ids),
+                        data={CONF_RECEIVER_COMMAND_IDS: command_ids},
+                    )
+
+            if len(command_ids) > 1:
+                errors["base"] = "invalid_command_ids"
+                placeholders["command_ids"] = ", ".join(invalid)
+            else:
+                errors["base"] = "invalid_command_id"
 
         return self.async_show_form(
             step_id="user",
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
+            description_placeholders=placeholders,
+        )
+
+
+class PreHdoOptionsFlow(OptionsFlow):
+    """Manage the appliances of an entry, tracked for each of its receivers.
+
+    Each appliance is a name and the minutes it needs to run, stored as a
+    list under CONF_PERIODS in the entry options.
+    """
+
+    @property
+    def _appliances(self) -> list[dict[str, Any]]:
+        """Return the currently configured appliances."""
+        return self.config_entry.options.get(CONF_PERIODS, [])
+
+    async def async_step_init(
+        self,
+        user_input: dict[str, Any] | None = None,  # noqa: ARG002
+    ) -> ConfigFlowResult:
+        """Choose whether to add or remove appliances."""
+        menu_options = ["add_appliance"]
+        if self._appliances:
+            menu_options.append("remove_appliance")
+        return self.async_show_menu(step_id="init", menu_options=menu_options)
+
+    async def async_step_add_appliance(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Add an appliance with its run minutes."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            name = user_input[CONF_PERIOD_NAME].strip()
+            if error := appliance_name_error(name, self._appliances):
+                errors[CONF_PERIOD_NAME] = error
+            else:
+                appliance = {
+                    CONF_PERIOD_NAME: name,
+                    CONF_PERIOD_MINUTES: user_input[CONF_PERIOD_MINUTES],
+                }
+                return self.async_create_entry(
+                    data={
+                        **self.config_entry.options,
+                        CONF_PERIODS: [*self._appliances, appliance],
+                    }
+                )
+
+        return self.async_show_form(
+            step_id="add_appliance",
+            data_schema=STEP_ADD_APPLIANCE_DATA_SCHEMA,
+            errors=errors,
+        )
+
+    async def async_step_remove_appliance(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Remove the selected appliances."""
+        if user_input is not None:
+            removed = set(user_input[CONF_PERIODS])
+            return self.async_create_entry(
+                data={
+                    **self.config_entry.options,
+                    CONF_PERIODS: [
+                        a
+                        for a in self._appliances
+                        if a[CONF_PERIOD_NAME] not in removed
+                    ],
+                }
+            )
+
+        names = [a[CONF_PERIOD_NAME] for a in self._appliances]
+        return self.async_show_form(
+            step_id="remove_appliance",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_PERIODS, default=[]): cv.multi_select(names)}
+            ),
         )
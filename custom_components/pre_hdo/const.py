@@ -3,6 +3,7 @@
 DOMAIN = "pre_hdo"
 
 CONF_RECEIVER_COMMAND_ID = "receiver_command_id"
+CONF_RECEIVER_COMMAND_IDS = "receiver_command_ids"
 CONF_PERIODS = "periods"
 CONF_PERIOD_NAME = "name"
 CONF_PERIOD_MINUTES = "minutes"
@@ -11,7 +12,12 @@ BASE_URL = "https://www.predistribuce.cz"
 HDO_ONE_DAY_URL = f"{BASE_URL}/com/PREdi/UI/Forms/Hdo/HdoForm:hdoOneDayAjax"
 HDO_PAGE_URL = f"{BASE_URL}/cs/potrebuji-zaridit/zakaznici/stav-hdo/"
 
-DEFAULT_SCAN_INTERVAL = 900  # 15 minutes
+DEFAULT_SCAN_INTERVAL = 21600  # 6 hours, the schedule only changes day to day
+PREFETCH_DAYS = 7  # today plus the following days
+MAX_CONCURRENT_REQUESTS = 3
 
 TARIFF_LOW = "NT"
 TARIFF_HIGH = "VT"
+
+# Fired when a fetched schedule differs from the cached one for its day
+EVENT_SCHEDULE_CHANGED = f"{DOMAIN}_schedule_changed"
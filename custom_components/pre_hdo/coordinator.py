@@ -2,113 +2,539 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
-from datetime import UTC, datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
 from typing import TYPE_CHECKING
 
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_point_in_time,
+    async_track_time_interval,
+)
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api_client import PreHdoApiClient, PreHdoApiError
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
-from .parser import HdoPeriod, get_current_tariff, get_time_remaining
+from .api_client import backoff_delay
+from .const import (
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    EVENT_SCHEDULE_CHANGED,
+    PREFETCH_DAYS,
+    TARIFF_HIGH,
+    TARIFF_LOW,
+)
+from .metrics import CoordinatorMetrics
+from .parser import (
+    MINUTES_PER_DAY,
+    HdoPeriod,
+    HdoSchedule,
+    HdoTimeline,
+    compile_schedule,
+    diff_schedules,
+    minute_of_day,
+    periods_as_dicts,
+)
+from .stats import PreHdoStatistics
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
 
+    from .hub import PreHdoHub
+
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class HdoData:
     """Processed HDO data for entity consumption."""
 
-    periods: list[HdoPeriod] = field(default_factory=list)
+    # Today's compiled schedule, shared with the coordinator's cache
+    schedule: HdoSchedule | None = None
     current_tariff: str | None = None
     is_low_tariff: bool = False
     minutes_to_next_change: int = 0
     minutes_to_low_tariff: int = 0
     minutes_to_high_tariff: int = 0
+    # Whether each configured appliance can run now, by name
+    appliances: dict[str, bool] = field(default_factory=dict)
+    # When the schedule was last fetched successfully, even if unchanged
+    last_success: datetime | None = None
+    # Upcoming transitions, only changing when a block starts or ends
+    next_low_tariff: datetime | None = None
+    next_high_tariff: datetime | None = None
+    tariff_ends: datetime | None = None
+
+    @property
+    def periods(self) -> list[HdoPeriod]:
+        """Return today's periods, materialised from the schedule."""
+        return self.schedule.periods if self.schedule is not None else []
+
+
+def can_appliance_run(
+    data: HdoData, minutes_needed: int, *, partial_minute: bool = False
+) -> bool:
+    """Check if an appliance can complete within the current low tariff window.
 
+    Uses the fit rule of HdoTimeline.find_low_window: the run may end exactly
+    when high tariff starts. With partial_minute, now is past the start of
+    its minute, which then no longer counts, as find_window rounds now up.
+    """
+    if not data.is_low_tariff:
+        return False
+    return minutes_needed <= data.minutes_to_high_tariff - partial_minute
 
-def process_periods(periods: list[HdoPeriod], now: time) -> HdoData:
-    """Process raw periods into HdoData for the current time."""
-    if not periods:
-        return HdoData()
-
-    current_tariff = get_current_tariff(periods, now)
-    remaining = get_time_remaining(periods, now)
-
-    if current_tariff == "NT":
-        minutes_to_low = 0
-        minutes_to_high = remaining
-    elif current_tariff == "VT":
-        minutes_to_high = 0
-        current_idx = _find_current_index(periods, now)
-        minutes_to_low = remaining
-        for i in range(current_idx + 1, len(periods)):
-            if periods[i].tariff == "NT":
-                break
-            minutes_to_low += _period_duration(periods[i])
+
+def process_periods(
+    periods: list[HdoPeriod] | HdoSchedule,
+    now: time,
+    timeline: HdoTimeline | None = None,
+    run_minutes: Mapping[str, int] | None = None,
+) -> HdoData:
+    """Process today's periods into HdoData for the current time.
+
+    The minute values are computed against the timeline, which should start
+    with today and may continue into the following days. Without one, the
+    values stop at midnight. Appliances given with their run minutes are
+    evaluated in the same pass.
+    """
+    schedule = compile_schedule(periods)
+    if not schedule.tariffs:
+        data = HdoData()
     else:
-        minutes_to_low = 0
-        minutes_to_high = 0
-
-    return HdoData(
-        periods=periods,
-        current_tariff=current_tariff,
-        is_low_tariff=current_tariff == "NT",
-        minutes_to_next_change=remaining,
-        minutes_to_low_tariff=minutes_to_low,
-        minutes_to_high_tariff=minutes_to_high,
-    )
+        if timeline is None:
+            timeline = HdoTimeline.stitch([schedule])
 
+        minute = minute_of_day(now)
+        current_tariff = schedule.tariff_at(minute)
+        data = HdoData(
+            schedule=schedule,
+            current_tariff=current_tariff,
+            is_low_tariff=current_tariff == "NT",
+            minutes_to_next_change=timeline.remaining(minute),
+            minutes_to_low_tariff=timeline.minutes_to_low(minute),
+            minutes_to_high_tariff=timeline.minutes_to_high(minute),
+        )
 
-def _find_current_index(periods: list[HdoPeriod], now: time) -> int:
-    """Find the index of the period containing the given time."""
-    for i, period in enumerate(periods):
-        if period.end == time(0, 0):
-            if now >= period.start:
-                return i
-        elif period.start <= now < period.end:
-            return i
-    return -1
+    if run_minutes:
+        partial_minute = bool(now.second or now.microsecond)
+        data.appliances = {
+            name: can_appliance_run(data, minutes, partial_minute=partial_minute)
+            for name, minutes in run_minutes.items()
+        }
+    return data
 
 
-def _period_duration(period: HdoPeriod) -> int:
-    """Return duration of a period in minutes."""
-    if period.end == time(0, 0):
-        return 24 * 60 - (period.start.hour * 60 + period.start.minute)
-    return (period.end.hour * 60 + period.end.minute) - (
-        period.start.hour * 60 + period.start.minute
+def timeline_datetime(today: date, minute: int) -> datetime:
+    """Return the local datetime of a minute on a timeline starting today."""
+    days, minute = divmod(minute, MINUTES_PER_DAY)
+    hours, minutes = divmod(minute, 60)
+    return datetime.combine(
+        today + timedelta(days=days),
+        time(hours, minutes),
+        dt_util.get_default_time_zone(),
     )
 
 
+def timeline_minute(today: date, when: datetime, *, round_up: bool = False) -> int:
+    """Return the minute of a local datetime on a timeline starting today.
+
+    Seconds are dropped, or rounded up to the next minute with round_up.
+    """
+    when = dt_util.as_local(when)
+    minute = (when.date() - today).days * MINUTES_PER_DAY + minute_of_day(when)
+    if round_up and (when.second or when.microsecond):
+        minute += 1
+    return minute
+
+
 class PreHdoCoordinator(DataUpdateCoordinator[HdoData]):
     """Coordinator for fetching PRE Distribuce HDO data."""
 
     def __init__(
         self,
         hass: HomeAssistant,
-        client: PreHdoApiClient,
+        hub: PreHdoHub,
         command_id: str,
+        run_minutes: Mapping[str, int] | None = None,
+        update_interval: timedelta | None = timedelta(seconds=DEFAULT_SCAN_INTERVAL),
     ) -> None:
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            update_interval=update_interval,
+            # Only notify entities when the processed data actually changed
+            always_update=False,
         )
-        self.client = client
+        self.hub = hub
         self.command_id = command_id
+        # Run minutes of the configured appliances, by name
+        self.run_minutes = dict(run_minutes or {})
+        # Rolling window of known schedules, today and the prefetched days
+        self.days: dict[date, HdoSchedule] = {}
+        # Days from today stitched together, rebuilt when the window changes
+        self._timeline: HdoTimeline | None = None
+        self._timeline_date: date | None = None
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        self._unsub_retry: CALLBACK_TYPE | None = None
+        self._failed_refreshes = 0
+        # Days that failed in the last refresh, and the days a retry fetches
+        self._failed_days: list[date] = []
+        self._retry_days: list[date] | None = None
+        self._unsub_hub: CALLBACK_TYPE | None = hub.async_subscribe(
+            command_id, self._async_schedule_fetched
+        )
+        self._tick_users = 0
+        self._unsub_tick: CALLBACK_TYPE | None = None
+        self.metrics = CoordinatorMetrics()
+        # Daily tariff totals for long-term statistics, if the recorder runs
+        self.statistics = (
+            PreHdoStatistics(hass, command_id)
+            if "recorder" in hass.config.components
+            else None
+        )
 
     async def _async_update_data(self) -> HdoData:
-        """Fetch and process HDO data."""
-        try:
-            periods = await self.client.async_get_hdo_periods(self.command_id)
-        except PreHdoApiError as err:
-            msg = f"Error fetching HDO data: {err}"
-            raise UpdateFailed(msg) from err
-
-        now = datetime.now(tz=UTC).time()
-        return process_periods(periods, now)
+        """Fetch the upcoming days' schedules and process them for now.
+
+        Days that fail keep their last fetched schedule and are retried with
+        backoff, a retry only fetching them. The refresh only fails if
+        today's schedule is not known.
+        """
+        now = dt_util.now()
+        today = now.date()
+        retry_days, self._retry_days = self._retry_days, None
+        days = [day for day in retry_days or () if day >= today] or [
+            today + timedelta(days=offset) for offset in range(PREFETCH_DAYS)
+        ]
+        # Fetched days arrive through _async_schedule_fetched
+        started = perf_counter()
+        batch = await self.hub.async_fetch(self.command_id, days)
+        refresh_ms = (perf_counter() - started) * 1000
+
+        self.metrics.refreshes += 1
+        self.metrics.failed_days += len(batch.errors)
+        self.metrics.refresh_ms.observe(refresh_ms)
+        _LOGGER.debug(
+            "Refreshed %d days for %s in %.1f ms, %d failed",
+            len(days),
+            self.command_id,
+            refresh_ms,
+            len(batch.errors),
+        )
+        for day, err in batch.errors.items():
+            _LOGGER.debug(
+                "Error fetching HDO data for %s on %s: %s", self.command_id, day, err
+            )
+        self._async_schedule_retry(sorted(batch.errors))
+
+        self._async_prune_days(today)
+        if today not in self.days:
+            self.metrics.failed_refreshes += 1
+            msg = f"Error fetching HDO data: {batch.errors.get(today)}"
+            raise UpdateFailed(msg)
+
+        self._async_schedule_transition(now)
+        if self.statistics is not None:
+            # Only reads the recorder once per start, then imports new days
+            self.hass.async_create_background_task(
+                self.statistics.async_import(dict(self.days), today),
+                f"{DOMAIN}_statistics_{self.command_id}",
+            )
+        return self._async_process(now)
+
+    @callback
+    def _async_schedule_retry(self, failed_days: list[date]) -> None:
+        """Retry failed days with backoff, ahead of the regular interval."""
+        if self._unsub_retry is not None:
+            self._unsub_retry()
+            self._unsub_retry = None
+        self._failed_days = failed_days
+        if not failed_days:
+            self._failed_refreshes = 0
+            return
+
+        # Never earlier than the circuit breaker lets requests through
+        delay = max(
+            backoff_delay(self._failed_refreshes), self.hub.client.breaker.retry_in
+        )
+        self._failed_refreshes += 1
+        self._unsub_retry = async_call_later(self.hass, delay, self._async_handle_retry)
+
+    async def _async_handle_retry(self, _now: datetime) -> None:
+        """Refetch the days that failed in the last refresh."""
+        self._unsub_retry = None
+        self._retry_days = self._failed_days
+        await self.async_refresh()
+
+    @callback
+    def async_restore_schedule(self) -> bool:
+        """Hydrate the schedule window from the on-disk cache.
+
+        Returns True if a cached schedule for today was found and published.
+        """
+        now = dt_util.now()
+        cached = self.hub.store.get_schedule(self.command_id, now.date())
+        for day, periods in cached.items():
+            self.days[day] = HdoSchedule.from_periods(periods)
+        self._timeline = None
+        if now.date() not in self.days:
+            return False
+
+        self._async_schedule_transition(now)
+        self.async_set_updated_data(self._async_process(now))
+        return True
+
+    @callback
+    def _async_schedule_fetched(self, day: date, schedule: HdoSchedule) -> None:
+        """Take a schedule fetched by the hub, possibly for another entry."""
+        previous = self.days.get(day)
+        if previous == schedule:
+            return
+        self.days[day] = schedule
+        if previous is not None:
+            self._async_fire_changed(day, previous, schedule)
+        self._timeline = None
+
+        now = dt_util.now()
+        if self.data is None or now.date() not in self.days:
+            return
+        # The schedule may have changed outside of our own refresh
+        self._async_schedule_transition(now)
+        self._async_publish(self._async_process(now))
+
+    @callback
+    def _async_fire_changed(
+        self, day: date, previous: HdoSchedule, schedule: HdoSchedule
+    ) -> None:
+        """Fire an event with the blocks that changed in a day's schedule."""
+        diff = diff_schedules(previous, schedule)
+        if not diff:
+            # Only split or joined differently
+            return
+        _LOGGER.debug("Schedule of %s on %s changed: %s", self.command_id, day, diff)
+        self.hass.bus.async_fire(
+            EVENT_SCHEDULE_CHANGED,
+            {
+                "command_id": self.command_id,
+                "date": day.isoformat(),
+                "added": periods_as_dicts(diff.added),
+                "removed": periods_as_dicts(diff.removed),
+                "shifted": [
+                    {
+                        **new,
+                        "previous_start": old["start"],
+                        "previous_end": old["end"],
+                    }
+                    for old, new in zip(
+                        periods_as_dicts([old for old, _ in diff.shifted]),
+                        periods_as_dicts([new for _, new in diff.shifted]),
+                        strict=True,
+                    )
+                ],
+            },
+        )
+
+    @callback
+    def async_track_minute_ticks(self) -> CALLBACK_TYPE:
+        """Recompute the data every minute while the returned remover is held.
+
+        Used by entities whose value changes between period boundaries. The
+        coordinator joins the hub's shared minute timer while at least one
+        such entity is added.
+        """
+        self._tick_users += 1
+        if self._unsub_tick is None:
+            self._unsub_tick = self.hub.async_track_minute(self._async_handle_tick)
+
+        @callback
+        def _async_remove() -> None:
+            self._tick_users -= 1
+            if not self._tick_users and self._unsub_tick is not None:
+                self._unsub_tick()
+                self._unsub_tick = None
+
+        return _async_remove
+
+    @callback
+    def _async_handle_tick(self, now: datetime) -> None:
+        """Recompute the minute values from the cached schedule."""
+        now = dt_util.as_local(now)
+        # A missing day is fetched by the transition at midnight
+        if self.data is None or now.date() not in self.days:
+            return
+        self._async_publish(self._async_process(now))
+
+    @callback
+    def _async_publish(self, data: HdoData) -> None:
+        """Publish locally computed data if it differs from the current data.
+
+        Listeners are updated directly, so the network refresh interval is
+        kept.
+        """
+        self.metrics.recomputes += 1
+        if data == self.data:
+            return
+        self.metrics.publishes += 1
+        self.data = data
+        self.async_update_listeners()
+
+    @callback
+    def _async_prune_days(self, today: date) -> None:
+        """Drop schedules of days that have passed."""
+        for day in [day for day in self.days if day < today]:
+            del self.days[day]
+            self._timeline = None
+
+    @callback
+    def _async_process(self, now: datetime) -> HdoData:
+        """Process the cached schedule window for the given time.
+
+        Requires today's schedule to be cached.
+        """
+        today, minute = now.date(), minute_of_day(now)
+        timeline = self.async_get_timeline(today)
+        data = process_periods(self.days[today], now.time(), timeline, self.run_minutes)
+        data.last_success = self.hub.store.get_last_success(self.command_id)
+        if (start := timeline.next_start(minute, TARIFF_LOW)) is not None:
+            data.next_low_tariff = timeline_datetime(today, start)
+        if (start := timeline.next_start(minute, TARIFF_HIGH)) is not None:
+            data.next_high_tariff = timeline_datetime(today, start)
+        if (end := timeline.block_end(minute)) is not None:
+            data.tariff_ends = timeline_datetime(today, end)
+        return data
+
+    @callback
+    def async_get_timeline(self, today: date) -> HdoTimeline:
+        """Return today and the consecutive cached days after it as a timeline.
+
+        Minute 0 of the timeline is local midnight of today.
+        """
+        if self._timeline is None or self._timeline_date != today:
+            days: list[HdoSchedule] = []
+            day = today
+            while (schedule := self.days.get(day)) is not None:
+                days.append(schedule)
+                day += timedelta(days=1)
+            self._timeline = HdoTimeline.stitch(days)
+            self._timeline_date = today
+        return self._timeline
+
+    @callback
+    def _async_schedule_transition(self, now: datetime) -> None:
+        """Arm a callback for the next period boundary of the cached schedule."""
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+
+        schedule = self.days.get(now.date())
+        next_change = (
+            schedule.next_change(minute_of_day(now)) if schedule else MINUTES_PER_DAY
+        )
+        when = timeline_datetime(now.date(), next_change)
+
+        self._unsub_transition = async_track_point_in_time(
+            self.hass, self._async_handle_transition, when
+        )
+
+    async def _async_handle_transition(self, now: datetime) -> None:
+        """Recompute state at a period boundary without touching the network."""
+        self._unsub_transition = None
+        now = dt_util.as_local(now)
+
+        self._async_prune_days(now.date())
+        if now.date() not in self.days:
+            # Today was not prefetched, the refresh re-arms the timer
+            await self.async_refresh()
+            return
+
+        self._async_schedule_transition(now)
+        self._async_publish(self._async_process(now))
+
+    async def async_shutdown(self) -> None:
+        """Cancel the timers and shut down the coordinator."""
+        if self._unsub_hub is not None:
+            self._unsub_hub()
+            self._unsub_hub = None
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+        if self._unsub_retry is not None:
+            self._unsub_retry()
+            self._unsub_retry = None
+        await super().async_shutdown()
+
+
+class PreHdoReceivers:
+    """The receivers of one config entry, refreshed together.
+
+    Each receiver has its own coordinator for its state and period
+    boundaries, but the coordinators have no refresh timers of their own.
+    One timer refreshes all of them at once, and their fetches go through
+    the hub to the client, which caps the concurrent requests.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        hub: PreHdoHub,
+        command_ids: Iterable[str],
+        run_minutes: Mapping[str, int] | None = None,
+    ) -> None:
+        self.hass = hass
+        self.coordinators = {
+            command_id: PreHdoCoordinator(
+                hass, hub, command_id, run_minutes, update_interval=None
+            )
+            for command_id in command_ids
+        }
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_setup(self, entry: ConfigEntry) -> None:
+        """Restore cached schedules and start the first refresh in the background.
+
+        Setup does not wait on PRE Distribuce. Receivers without a cached
+        schedule start without data, their entities show the restored state
+        until the refresh completes.
+        """
+        for coordinator in self.coordinators.values():
+            coordinator.async_restore_schedule()
+        entry.async_create_background_task(
+            self.hass, self.async_refresh(), f"{DOMAIN}_refresh"
+        )
+
+        self._unsub_refresh = async_track_time_interval(
+            self.hass,
+            self._async_scheduled_refresh,
+            timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            name=f"{DOMAIN} refresh",
+        )
+
+    async def async_refresh(
+        self, coordinators: Iterable[PreHdoCoordinator] | None = None
+    ) -> None:
+        """Refresh the given receivers, or all of them, concurrently."""
+        if coordinators is None:
+            coordinators = self.coordinators.values()
+        await asyncio.gather(*(c.async_refresh() for c in coordinators))
+
+    async def _async_scheduled_refresh(self, _now: datetime) -> None:
+        """Refresh all receivers on the shared interval."""
+        await self.async_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the refresh timer and shut down the coordinators."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+        await asyncio.gather(*(c.async_shutdown() for c in self.coordinators.values()))
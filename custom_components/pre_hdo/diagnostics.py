@@ -0,0 +1,78 @@
+"""Diagnostics support for PRE Distribuce HDO."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .parser import periods_as_dicts
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from . import PreHdoConfigEntry
+    from .coordinator import PreHdoCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,  # noqa: ARG001
+    entry: PreHdoConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinators = entry.runtime_data.coordinators
+    hub = next(iter(coordinators.values())).hub
+    client = hub.client
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "receivers": [
+            _coordinator_diagnostics(coordinator)
+            for coordinator in coordinators.values()
+        ],
+        "hub": hub.metrics.as_dict(),
+        "client": {
+            "circuit_breaker": {
+                "failures": client.breaker.failures,
+                "open": client.breaker.is_open,
+                "retry_in": round(client.breaker.retry_in),
+            },
+            "metrics": client.metrics.as_dict(),
+        },
+    }
+
+
+def _coordinator_diagnostics(coordinator: PreHdoCoordinator) -> dict[str, Any]:
+    """Return diagnostics for one receiver."""
+    data = coordinator.data
+    last_success = data.last_success if data else None
+    return {
+        "command_id": coordinator.command_id,
+        "last_update_success": coordinator.last_update_success,
+        "last_success": _isoformat(last_success),
+        "data": None
+        if data is None
+        else {
+            "current_tariff": data.current_tariff,
+            "minutes_to_next_change": data.minutes_to_next_change,
+            "minutes_to_low_tariff": data.minutes_to_low_tariff,
+            "minutes_to_high_tariff": data.minutes_to_high_tariff,
+            "next_low_tariff": _isoformat(data.next_low_tariff),
+            "next_high_tariff": _isoformat(data.next_high_tariff),
+            "tariff_ends": _isoformat(data.tariff_ends),
+            "appliances": data.appliances,
+        },
+        "days": {
+            day.isoformat(): periods_as_dicts(schedule.periods)
+            for day, schedule in sorted(coordinator.days.items())
+        },
+        "metrics": coordinator.metrics.as_dict(),
+    }
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    """Return a datetime in ISO format, if set."""
+    return value.isoformat() if value is not None else None
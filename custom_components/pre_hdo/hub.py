@@ -0,0 +1,434 @@
+"""Domain-wide fetch hub shared by all PRE Distribuce HDO config entries."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from aiohttp import ClientSession, TCPConnector, hdrs
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+from homeassistant.util.ssl import get_default_context
+
+from .api_client import (
+    REQUEST_TIMEOUT,
+    CircuitBreaker,
+    HdoBatchResult,
+    PreHdoApiClient,
+    PreHdoApiError,
+)
+from .const import DOMAIN, MAX_CONCURRENT_REQUESTS
+from .metrics import HubMetrics
+from .parser import HdoSchedule
+from .store import async_get_schedule_store
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from datetime import date, datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from .parser import HdoPeriod
+    from .store import PreHdoScheduleStore
+
+    ScheduleListener = Callable[[date, HdoSchedule], None]
+    TickListener = Callable[[datetime], None]
+    FetchOutcome = HdoSchedule | PreHdoApiError
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HUB: HassKey[PreHdoHub] = HassKey(f"{DOMAIN}_hub")
+DATA_HUB_CACHE: HassKey[HubCache] = HassKey(f"{DOMAIN}_hub_cache")
+
+# Idle connections to PRE are kept this long for the rest of a batch
+KEEPALIVE_TIMEOUT = 30  # seconds
+DNS_CACHE_TTL = 300  # seconds
+
+# Fetched days and validation results are reused this long, so that the
+# first refresh of a new entry is served by the fetch of its config flow
+FETCH_CACHE_TTL = 300  # seconds
+
+
+@dataclass
+class HubCache:
+    """Fetch state kept across hubs, so that entry reloads start warm.
+
+    The hub is closed with the last loaded entry, which is also the case
+    while a single entry reloads.
+    """
+
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    # Last compiled schedule per key under the digest of its payload,
+    # reused while the payload is unchanged
+    schedules: dict[tuple[str, date], tuple[bytes, HdoSchedule]] = field(
+        default_factory=dict
+    )
+    # Recently fetched schedules and validation results, with their expiry
+    # in loop time
+    recent: dict[tuple[str, date], tuple[float, HdoSchedule]] = field(
+        default_factory=dict
+    )
+    validated: dict[str, tuple[float, bool]] = field(default_factory=dict)
+    # Schedules so far only fetched for validation, with when they were
+    # fetched; stored once an entry fetches them
+    unpersisted: dict[tuple[str, date], datetime] = field(default_factory=dict)
+
+
+@dataclass
+class HdoFetchResult:
+    """Compiled schedules of a fetch by the hub, with per-day errors."""
+
+    schedules: dict[date, HdoSchedule] = field(default_factory=dict)
+    errors: dict[date, PreHdoApiError] = field(default_factory=dict)
+
+
+def _create_session() -> ClientSession:
+    """Create the HTTP session dedicated to the PRE Distribuce endpoint.
+
+    The pool allows as many connections as the client makes concurrent
+    requests, and keeps them alive between the requests of a batch.
+    """
+    connector = TCPConnector(
+        limit_per_host=MAX_CONCURRENT_REQUESTS,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        ssl=get_default_context(),
+    )
+    return ClientSession(
+        connector=connector,
+        headers={
+            hdrs.USER_AGENT: SERVER_SOFTWARE,
+            hdrs.ACCEPT_ENCODING: "gzip, deflate",
+        },
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+class PreHdoHub:
+    """Single-flight fetcher that fans schedules out to subscribed coordinators.
+
+    Concurrent requests for the same (command_id, date) share one upstream
+    request. Every fetched schedule is cached in the store and handed to all
+    listeners subscribed to its command ID.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: PreHdoApiClient,
+        store: PreHdoScheduleStore,
+        session: ClientSession | None = None,
+        cache: HubCache | None = None,
+    ) -> None:
+        self.hass = hass
+        self.client = client
+        self.store = store
+        # Session owned by the hub, closed with it
+        self._session = session
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.unsub_close: CALLBACK_TYPE | None = None
+        self._inflight: dict[tuple[str, date], asyncio.Future[FetchOutcome]] = {}
+        self._listeners: dict[str, list[ScheduleListener]] = {}
+        self._tick_listeners: list[TickListener] = []
+        self._unsub_tick: CALLBACK_TYPE | None = None
+        self.metrics = HubMetrics()
+        if cache is None:
+            cache = HubCache(breaker=client.breaker)
+        self._schedules = cache.schedules
+        self._recent = cache.recent
+        self._validated = cache.validated
+        self._unpersisted = cache.unpersisted
+
+    @callback
+    def async_subscribe(
+        self, command_id: str, listener: ScheduleListener
+    ) -> CALLBACK_TYPE:
+        """Subscribe to schedules fetched for a command ID."""
+        listeners = self._listeners.setdefault(command_id, [])
+        listeners.append(listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            listeners.remove(listener)
+            if not listeners:
+                del self._listeners[command_id]
+
+        return _unsubscribe
+
+    @callback
+    def async_track_minute(self, listener: TickListener) -> CALLBACK_TYPE:
+        """Call the listener at the start of every minute.
+
+        All listeners share one timer, which only runs while there are
+        listeners.
+        """
+        self._tick_listeners.append(listener)
+        if self._unsub_tick is None:
+            self._unsub_tick = async_track_time_change(
+                self.hass, self._async_handle_tick, second=0
+            )
+
+        @callback
+        def _unsubscribe() -> None:
+            self._tick_listeners.remove(listener)
+            if not self._tick_listeners and self._unsub_tick is not None:
+                self._unsub_tick()
+                self._unsub_tick = None
+
+        return _unsubscribe
+
+    @callback
+    def _async_handle_tick(self, now: datetime) -> None:
+        """Fan the minute tick out to all listeners."""
+        for listener in list(self._tick_listeners):
+            listener(now)
+
+    async def async_fetch(
+        self, command_id: str, days: Iterable[date], *, persist: bool = True
+    ) -> HdoFetchResult:
+        """Fetch schedules for a command ID, joining requests already in flight.
+
+        Days fetched within FETCH_CACHE_TTL are served from memory. Without
+        persist, fetched schedules are not written to the store until a
+        fetch with persist returns them, so that command IDs rejected in a
+        config flow are never stored.
+        """
+        result = HdoFetchResult()
+        pending: dict[date, asyncio.Future[FetchOutcome]] = {}
+        missing: dict[date, asyncio.Future[FetchOutcome]] = {}
+        now = self.hass.loop.time()
+        for day in days:
+            key = (command_id, day)
+            if (recent := self._recent.get(key)) is not None and recent[0] > now:
+                self.metrics.fetch_cache_hits += 1
+                result.schedules[day] = recent[1]
+                self._async_publish(command_id, day, recent[1])
+                continue
+            if (future := self._inflight.get(key)) is None:
+                future = self.hass.loop.create_future()
+                self._inflight[key] = missing[day] = future
+            else:
+                self.metrics.joined_fetches += 1
+            pending[day] = future
+
+        if missing:
+            # Run the upstream fetch in its own task so that a cancelled
+            # caller does not strand the other callers waiting on it
+            task = self.hass.async_create_background_task(
+                self._async_fetch_missing(command_id, missing, persist=persist),
+                f"{DOMAIN}_fetch_{command_id}",
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        for day, future in pending.items():
+            outcome = await asyncio.shield(future)
+            if isinstance(outcome, PreHdoApiError):
+                result.errors[day] = outcome
+            else:
+                result.schedules[day] = outcome
+        if persist and self._unpersisted:
+            self._async_persist_fetched(command_id, result.schedules)
+        return result
+
+    async def _async_fetch_missing(
+        self,
+        command_id: str,
+        futures: dict[date, asyncio.Future[FetchOutcome]],
+        *,
+        persist: bool,
+    ) -> None:
+        """Fetch the given days upstream and resolve their futures."""
+        # Taken before the fetch, as days may be pruned while it runs
+        known = {
+            day: cached
+            for day in futures
+            if (cached := self._schedules.get((command_id, day))) is not None
+        }
+        try:
+            batch = await self.client.async_get_hdo_periods_batch(
+                command_id, futures, {day: digest for day, (digest, _) in known.items()}
+            )
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as err:
+            _LOGGER.exception("Unexpected error fetching HDO data for %s", command_id)
+            batch = HdoBatchResult(
+                errors=dict.fromkeys(futures, PreHdoApiError(str(err)))
+            )
+        finally:
+            for day in futures:
+                self._inflight.pop((command_id, day), None)
+
+        self._reject_empty_schedules(command_id, batch)
+        if batch.digests and persist:
+            self.store.async_set_last_success(command_id, dt_util.utcnow())
+        for day, err in batch.errors.items():
+            futures[day].set_result(err)
+        now = self.hass.loop.time()
+        for key in [k for k, (expires, _) in self._recent.items() if expires <= now]:
+            del self._recent[key]
+        for day, digest in batch.digests.items():
+            if (periods := batch.periods.get(day)) is None:
+                self.metrics.schedule_cache_hits += 1
+                schedule = known[day][1]
+            else:
+                schedule = self._async_compile(
+                    command_id, day, digest, periods, persist=persist
+                )
+            futures[day].set_result(schedule)
+            self._recent[(command_id, day)] = (now + FETCH_CACHE_TTL, schedule)
+            self._async_publish(command_id, day, schedule)
+
+    def _reject_empty_schedules(self, command_id: str, batch: HdoBatchResult) -> None:
+        """Turn empty days into errors where a non-empty schedule is cached.
+
+        An empty response, e.g. a maintenance page, never replaces a known
+        schedule; the day is retried like any failed one.
+        """
+        for day in [d for d, periods in batch.periods.items() if not periods]:
+            if self.store.has_periods(command_id, day):
+                del batch.periods[day]
+                del batch.digests[day]
+                self.metrics.empty_schedules_rejected += 1
+                batch.errors[day] = PreHdoApiError(
+                    f"Empty schedule received for {command_id} on {day}, "
+                    "keeping the cached one"
+                )
+
+    @callback
+    def _async_persist_fetched(
+        self, command_id: str, schedules: dict[date, HdoSchedule]
+    ) -> None:
+        """Store the schedules among these that were only fetched for validation."""
+        for day, schedule in schedules.items():
+            if (fetched := self._unpersisted.pop((command_id, day), None)) is None:
+                continue
+            self.store.async_set_periods(command_id, day, schedule.periods)
+            self.store.async_set_last_success(command_id, fetched)
+
+    @callback
+    def _async_publish(self, command_id: str, day: date, schedule: HdoSchedule) -> None:
+        """Hand a schedule to the listeners of its command ID."""
+        for listener in list(self._listeners.get(command_id, [])):
+            listener(day, schedule)
+
+    async def async_validate_command_ids(
+        self, command_ids: Iterable[str]
+    ) -> dict[str, bool]:
+        """Validate receiver command IDs by fetching their schedule for today.
+
+        Results are remembered for FETCH_CACHE_TTL, except failed requests,
+        and the fetched days serve the first refresh of the new entry.
+        """
+        command_ids = list(command_ids)
+        today = dt_util.now().date()
+        now = self.hass.loop.time()
+        for command_id in [
+            c for c, (expires, _) in self._validated.items() if expires <= now
+        ]:
+            del self._validated[command_id]
+        results: dict[str, bool] = {}
+        for command_id in command_ids:
+            if (cached := self._validated.get(command_id)) is not None:
+                self.metrics.validation_cache_hits += 1
+                results[command_id] = cached[1]
+
+        pending = [c for c in command_ids if c not in results]
+        batches = await asyncio.gather(
+            *(self.async_fetch(c, [today], persist=False) for c in pending)
+        )
+        for command_id, batch in zip(pending, batches, strict=True):
+            schedule = batch.schedules.get(today)
+            results[command_id] = schedule is not None and bool(schedule.tariffs)
+            if today not in batch.errors:
+                self._validated[command_id] = (
+                    now + FETCH_CACHE_TTL,
+                    results[command_id],
+                )
+        return {command_id: results[command_id] for command_id in command_ids}
+
+    @callback
+    def _async_compile(
+        self,
+        command_id: str,
+        day: date,
+        digest: bytes,
+        periods: list[HdoPeriod],
+        *,
+        persist: bool,
+    ) -> HdoSchedule:
+        """Compile, cache and store the periods of a changed payload."""
+        self.metrics.schedule_cache_misses += 1
+        schedule = HdoSchedule.from_periods(periods)
+        key = (command_id, day)
+        self._schedules[key] = (digest, schedule)
+        if persist:
+            self.store.async_set_periods(command_id, day, periods)
+            self._unpersisted.pop(key, None)
+        else:
+            self._unpersisted[key] = dt_util.utcnow()
+
+        # Forget days that have passed
+        today = dt_util.now().date()
+        for old_key in [k for k in self._schedules if k[1] < today]:
+            del self._schedules[old_key]
+            self._unpersisted.pop(old_key, None)
+        return schedule
+
+    async def async_close(self) -> None:
+        """Cancel fetches in flight and close the owned session."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        if self._session is not None:
+            await self._session.close()
+
+
+async def async_get_hub(hass: HomeAssistant) -> PreHdoHub:
+    """Return the fetch hub shared by all config entries and config flows.
+
+    The hub and its HTTP session are created on first use and live until
+    the last config entry is unloaded or Home Assistant shuts down. Its
+    caches and circuit state outlive it, for the next hub.
+    """
+    if (hub := hass.data.get(DATA_HUB)) is None:
+        store = await async_get_schedule_store(hass)
+        # Another entry may have created the hub while the store was loading
+        if (hub := hass.data.get(DATA_HUB)) is None:
+            if (cache := hass.data.get(DATA_HUB_CACHE)) is None:
+                cache = hass.data[DATA_HUB_CACHE] = HubCache()
+            session = _create_session()
+            client = PreHdoApiClient(session=session, breaker=cache.breaker)
+            hub = hass.data[DATA_HUB] = PreHdoHub(hass, client, store, session, cache)
+
+            async def _async_close(_event: Event) -> None:
+                hub.unsub_close = None  # Removed once fired
+                await async_close_hub(hass)
+
+            hub.unsub_close = hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_CLOSE, _async_close
+            )
+    return hub
+
+
+async def async_close_hub(hass: HomeAssistant) -> None:
+    """Close the shared hub, if there is one."""
+    if (hub := hass.data.pop(DATA_HUB, None)) is None:
+        return
+    if hub.unsub_close is not None:
+        hub.unsub_close()
+        hub.unsub_close = None
+    await hub.async_close()
@@ -0,0 +1,121 @@
+"""In-memory instrumentation for PRE Distribuce HDO, shown in diagnostics."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+# Upper bounds of the histogram buckets in milliseconds
+FETCH_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+PARSE_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50)
+REFRESH_BUCKETS_MS = (1, 10, 100, 500, 1000, 5000, 10000, 30000, 60000)
+
+
+@dataclass
+class Histogram:
+    """Counts of observed values per bucket, with their sum and maximum."""
+
+    bounds: tuple[float, ...]
+    counts: list[int] = field(init=False)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        labels = [f"<={bound}" for bound in self.bounds]
+        labels.append(f">{self.bounds[-1]}")
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts, strict=True)),
+        }
+
+
+@dataclass
+class ClientMetrics:
+    """Upstream requests made by the API client."""
+
+    requests: int = 0
+    bytes_received: int = 0
+    payload_cache_hits: int = 0
+    payload_cache_misses: int = 0
+    # Failed requests by kind, including those refused by the circuit breaker
+    errors: Counter[str] = field(default_factory=Counter)
+    fetch_ms: Histogram = field(default_factory=lambda: Histogram(FETCH_BUCKETS_MS))
+    parse_ms: Histogram = field(default_factory=lambda: Histogram(PARSE_BUCKETS_MS))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "requests": self.requests,
+            "bytes_received": self.bytes_received,
+            "payload_cache_hits": self.payload_cache_hits,
+            "payload_cache_misses": self.payload_cache_misses,
+            "errors": dict(self.errors),
+            "fetch_ms": self.fetch_ms.as_dict(),
+            "parse_ms": self.parse_ms.as_dict(),
+        }
+
+
+@dataclass
+class HubMetrics:
+    """Fetches coordinated by the hub."""
+
+    # Days requested while a fetch of them was already in flight
+    joined_fetches: int = 0
+    schedule_cache_hits: int = 0
+    schedule_cache_misses: int = 0
+    # Days and validations answered by recent fetches instead of requests
+    fetch_cache_hits: int = 0
+    validation_cache_hits: int = 0
+    # Empty schedules not replacing a cached non-empty one
+    empty_schedules_rejected: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "joined_fetches": self.joined_fetches,
+            "schedule_cache_hits": self.schedule_cache_hits,
+            "schedule_cache_misses": self.schedule_cache_misses,
+            "fetch_cache_hits": self.fetch_cache_hits,
+            "validation_cache_hits": self.validation_cache_hits,
+            "empty_schedules_rejected": self.empty_schedules_rejected,
+        }
+
+
+@dataclass
+class CoordinatorMetrics:
+    """Refreshes and local recomputations of one coordinator."""
+
+    refreshes: int = 0
+    failed_refreshes: int = 0
+    failed_days: int = 0
+    # Recomputations from the cached schedule at ticks and boundaries
+    recomputes: int = 0
+    publishes: int = 0
+    refresh_ms: Histogram = field(default_factory=lambda: Histogram(REFRESH_BUCKETS_MS))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "refreshes": self.refreshes,
+            "failed_refreshes": self.failed_refreshes,
+            "failed_days": self.failed_days,
+            "recomputes": self.recomputes,
+            "publishes": self.publishes,
+            "refresh_ms": self.refresh_ms.as_dict(),
+        }
@@ -3,14 +3,28 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from datetime import time
+from typing import TYPE_CHECKING
 
-TARIFF_PATTERN = re.compile(r'class="hdo(nt|vt)"')
-TIME_RANGE_PATTERN = re.compile(r'title="(\d{2}:\d{2}) - (\d{2}:\d{2})"')
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
 
+# Tariff elements and their time ranges in document order, in one sweep.
+# The optional backslashes let the scanner run on the raw JSON response,
+# where the quotes of the embedded HTML are escaped.
+_ELEMENT_PATTERN = (
+    r'class=\\?"hdo(nt|vt)\\?"'
+    r'|title=\\?"(\d{2}:\d{2}) - (\d{2}:\d{2})\\?"'
+)
+ELEMENT_PATTERN = re.compile(_ELEMENT_PATTERN)
+ELEMENT_PATTERN_BYTES = re.compile(_ELEMENT_PATTERN.encode())
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class HdoPeriod:
     """A single tariff period with start/end times."""
 
@@ -19,62 +33,420 @@ class HdoPeriod:
     end: time
 
 
-def parse_hdo_periods(html: str) -> list[HdoPeriod]:
+@dataclass(frozen=True)
+class HdoParseIssue:
+    """An element that could not be turned into a period."""
+
+    offset: int  # Position of the element in the scanned input
+    message: str
+
+
+@dataclass
+class HdoParseResult:
+    """Periods found by the scanner, with diagnostics for skipped elements."""
+
+    periods: list[HdoPeriod] = field(default_factory=list)
+    issues: list[HdoParseIssue] = field(default_factory=list)
+
+
+def periods_as_dicts(periods: list[HdoPeriod]) -> list[dict[str, str]]:
+    """Return periods as JSON-friendly dicts for attributes and services."""
+    return [
+        {
+            "tariff": p.tariff,
+            "start": p.start.strftime("%H:%M"),
+            "end": p.end.strftime("%H:%M"),
+        }
+        for p in periods
+    ]
+
+
+def scan_hdo_periods(html: str | bytes) -> HdoParseResult:
+    """Scan the AJAX response for periods in a single pass.
+
+    Each ``hdont``/``hdovt`` element is paired with the time range that
+    follows it. Elements that cannot be paired are skipped and reported as
+    issues, so one stray element does not discard the rest of the day.
+    Accepts the HTML itself or the raw JSON response body.
+    """
+    if isinstance(html, bytes):
+        matches = ELEMENT_PATTERN_BYTES.finditer(html)
+    else:
+        matches = ELEMENT_PATTERN.finditer(html)
+
+    result = HdoParseResult()
+    pending: tuple[int, str] | None = None
+    for match in matches:
+        tariff_code, start_str, end_str = match.groups()
+        if tariff_code is not None:
+            if pending is not None:
+                result.issues.append(
+                    HdoParseIssue(pending[0], "tariff element without time range")
+                )
+            pending = (match.start(), "NT" if tariff_code in {"nt", b"nt"} else "VT")
+            continue
+
+        if pending is None:
+            result.issues.append(
+                HdoParseIssue(match.start(), "time range without tariff element")
+            )
+            continue
+
+        offset, tariff = pending
+        pending = None
+        if isinstance(start_str, bytes):
+            start_str, end_str = start_str.decode(), end_str.decode()
+        try:
+            start = time.fromisoformat(start_str)
+            end = time.fromisoformat(end_str)
+        except ValueError:
+            result.issues.append(
+                HdoParseIssue(offset, f"invalid time range {start_str} - {end_str}")
+            )
+            continue
+        result.periods.append(HdoPeriod(tariff=tariff, start=start, end=end))
+
+    if pending is not None:
+        result.issues.append(
+            HdoParseIssue(pending[0], "tariff element without time range")
+        )
+    return result
+
+
+def parse_hdo_periods(html: str | bytes) -> list[HdoPeriod]:
     """Parse HDO periods from the AJAX HTML response.
 
     Returns list of HdoPeriod sorted by start time.
     """
-    tariffs = TARIFF_PATTERN.findall(html)
-    time_ranges = TIME_RANGE_PATTERN.findall(html)
+    return scan_hdo_periods(html).periods
 
-    if not tariffs or not time_ranges or len(tariffs) != len(time_ranges):
-        return []
 
-    periods: list[HdoPeriod] = []
-    for tariff_code, (start_str, end_str) in zip(tariffs, time_ranges, strict=False):
-        tariff = "NT" if tariff_code == "nt" else "VT"
-        start = time.fromisoformat(start_str)
-        end = time.fromisoformat(end_str)
-        periods.append(HdoPeriod(tariff=tariff, start=start, end=end))
+MINUTES_PER_DAY = 24 * 60
 
-    return periods
 
+# Typecode of the packed minute arrays of day schedules, which are cached
+# per receiver and day. Minutes of a single day fit into unsigned shorts.
+DAY_MINUTES = "H"
 
-def get_current_tariff(periods: list[HdoPeriod], now: time) -> str | None:
-    """Return the current tariff code ("NT" or "VT") at the given time."""
-    if not periods:
+
+def minute_of_day(value: time) -> int:
+    """Return minutes since midnight of a time, ignoring seconds."""
+    return value.hour * 60 + value.minute
+
+
+def time_of_minute(minute: int) -> time:
+    """Return the time of day of a minute, 1440 being the next midnight."""
+    return time(*divmod(minute % MINUTES_PER_DAY, 60))
+
+
+def _pack_day(values: list[int]) -> array[int]:
+    """Pack minutes of a single day into an array."""
+    return array(DAY_MINUTES, values)
+
+
+def _next_tariff_starts(
+    starts: Sequence[int],
+    ends: Sequence[int],
+    tariffs: Sequence[str],
+    tariff: str,
+) -> list[int]:
+    """Return, per index, the start of the next block with the given tariff.
+
+    Falls back to the end of the last block when no such block follows.
+    """
+    horizon = ends[-1] if ends else 0
+    result = [horizon] * len(starts)
+    for i in range(len(starts) - 2, -1, -1):
+        result[i] = starts[i + 1] if tariffs[i + 1] == tariff else result[i + 1]
+    return result
+
+
+def _lookup_tables(
+    starts: Sequence[int],
+    ends: Sequence[int],
+    tariffs: Sequence[str],
+    pack: Callable[[list[int]], Sequence[int]],
+) -> dict[str, Sequence[int]]:
+    """Precompute the lookup tables of a timeline, stored with pack."""
+    low_prefix = [0]
+    for start, end, tariff in zip(starts, ends, tariffs, strict=True):
+        low_prefix.append(low_prefix[-1] + (end - start if tariff == "NT" else 0))
+
+    return {
+        "next_low": pack(_next_tariff_starts(starts, ends, tariffs, "NT")),
+        "next_high": pack(_next_tariff_starts(starts, ends, tariffs, "VT")),
+        "low_starts": pack(
+            [
+                start
+                for start, tariff in zip(starts, tariffs, strict=True)
+                if tariff == "NT"
+            ]
+        ),
+        "low_prefix": pack(low_prefix),
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class HdoTimeline:
+    """Tariff blocks on a continuous minute axis for fast lookups.
+
+    Minute 0 is midnight of the first day, so blocks of following days have
+    offsets of 1440 and above. Stitched timelines keep their minutes in
+    tuples for the fastest lookups, day schedules in packed arrays.
+    """
+
+    starts: Sequence[int]
+    ends: Sequence[int]
+    tariffs: tuple[str, ...]
+    # Start minute of the next NT/VT block after each index, or the end of
+    # the timeline when no such block follows
+    next_low: Sequence[int]
+    next_high: Sequence[int]
+    # Starts of the NT blocks, and NT minutes before each block (prefix sums)
+    low_starts: Sequence[int]
+    low_prefix: Sequence[int]
+
+    @classmethod
+    def stitch(cls, days: Sequence[HdoSchedule]) -> HdoTimeline:
+        """Join consecutive days into one timeline, merging same-tariff blocks."""
+        starts: list[int] = []
+        ends: list[int] = []
+        tariffs: list[str] = []
+        for offset, day in enumerate(days):
+            base = offset * MINUTES_PER_DAY
+            for start, end, tariff in zip(
+                day.starts, day.ends, day.tariffs, strict=True
+            ):
+                if tariffs and tariffs[-1] == tariff and ends[-1] == base + start:
+                    ends[-1] = base + end
+                else:
+                    starts.append(base + start)
+                    ends.append(base + end)
+                    tariffs.append(tariff)
+
+        return HdoTimeline(
+            starts=tuple(starts),
+            ends=tuple(ends),
+            tariffs=tuple(tariffs),
+            **_lookup_tables(starts, ends, tariffs, tuple),
+        )
+
+    def index_at(self, minute: int) -> int:
+        """Return the index of the block containing the minute, or -1."""
+        i = bisect_right(self.starts, minute) - 1
+        if i >= 0 and minute < self.ends[i]:
+            return i
+        return -1
+
+    def blocks_between(self, start: int, end: int) -> range:
+        """Return the indices of the blocks overlapping the minutes [start, end).
+
+        Blocks are sorted and do not overlap, so both bounds are found by
+        bisection.
+        """
+        return range(bisect_right(self.ends, start), bisect_left(self.starts, end))
+
+    def tariff_at(self, minute: int) -> str | None:
+        """Return the tariff code active at the minute, if covered."""
+        i = self.index_at(minute)
+        return self.tariffs[i] if i >= 0 else None
+
+    def remaining(self, minute: int) -> int:
+        """Return minutes left in the block containing the minute."""
+        i = self.index_at(minute)
+        if i < 0:
+            return 0
+        return self.ends[i] - minute
+
+    def minutes_to_low(self, minute: int) -> int:
+        """Return minutes until low tariff starts, 0 if it is active."""
+        i = self.index_at(minute)
+        if i < 0 or self.tariffs[i] == "NT":
+            return 0
+        return self.next_low[i] - minute
+
+    def minutes_to_high(self, minute: int) -> int:
+        """Return minutes until high tariff starts, 0 if it is active."""
+        i = self.index_at(minute)
+        if i < 0 or self.tariffs[i] == "VT":
+            return 0
+        return self.next_high[i] - minute
+
+    def next_start(self, minute: int, tariff: str) -> int | None:
+        """Return the start of the next block of the tariff after the minute.
+
+        A block of the tariff containing the minute does not count. Returns
+        None if no such block follows in the timeline.
+        """
+        i = bisect_right(self.starts, minute)
+        if i == len(self.starts):
+            return None
+        if self.tariffs[i] == tariff:
+            return self.starts[i]
+        start = (self.next_low if tariff == "NT" else self.next_high)[i]
+        # The lookup tables fall back to the end of the timeline
+        return start if start < self.ends[-1] else None
+
+    def block_end(self, minute: int) -> int | None:
+        """Return the end of the block containing the minute, if covered."""
+        i = self.index_at(minute)
+        return self.ends[i] if i >= 0 else None
+
+    def low_minutes_before(self, minute: int) -> int:
+        """Return the NT minutes between the start of the timeline and the minute."""
+        i = bisect_right(self.starts, minute) - 1
+        if i < 0:
+            return 0
+        if self.tariffs[i] != "NT":
+            return self.low_prefix[i]
+        return self.low_prefix[i] + min(minute, self.ends[i]) - self.starts[i]
+
+    def find_low_window(self, minute: int, duration: int) -> int | None:
+        """Return the earliest start from the minute fitting a job into NT.
+
+        The job fits if every minute of it falls into low tariff, possibly
+        across adjacent NT blocks. Returns None if it does not fit anywhere
+        in the timeline.
+        """
+        candidates = [minute] if self.tariff_at(minute) == "NT" else []
+        candidates.extend(self.low_starts[bisect_right(self.low_starts, minute) :])
+        for start in candidates:
+            before = self.low_minutes_before(start)
+            if self.low_minutes_before(start + duration) - before == duration:
+                return start
         return None
 
-    for period in periods:
-        if period.end == time(0, 0):
-            # Period crosses midnight: active from start until 23:59:59
-            if now >= period.start:
-                return period.tariff
-        elif period.start <= now < period.end:
-            return period.tariff
 
-    return periods[-1].tariff
+@dataclass(frozen=True, slots=True)
+class HdoSchedule(HdoTimeline):
+    """A single day's periods compiled into a timeline.
 
+    Built once per parsed day. Period ends at 00:00 are stored as 1440, so
+    the midnight special case is handled here and nowhere else. Periods are
+    kept unmerged, as published. Schedules are cached per receiver and day,
+    so their minutes are packed into arrays and their tariff codes interned.
+    """
 
-def get_time_remaining(periods: list[HdoPeriod], now: time) -> int:
-    """Return minutes remaining in the current tariff period."""
-    if not periods:
-        return 0
+    @classmethod
+    def from_periods(cls, periods: Sequence[HdoPeriod]) -> HdoSchedule:
+        """Compile a day's periods, sorted by start time."""
+        periods = sorted(periods, key=lambda p: p.start)
+        starts = [minute_of_day(p.start) for p in periods]
+        ends = [minute_of_day(p.end) or MINUTES_PER_DAY for p in periods]
+        tariffs = tuple(sys.intern(p.tariff) for p in periods)
+
+        return cls(
+            starts=_pack_day(starts),
+            ends=_pack_day(ends),
+            tariffs=tariffs,
+            **_lookup_tables(starts, ends, tariffs, _pack_day),
+        )
+
+    @property
+    def periods(self) -> list[HdoPeriod]:
+        """Return the periods, materialised from the arrays on every call."""
+        return [
+            HdoPeriod(
+                tariff=tariff, start=time_of_minute(start), end=time_of_minute(end)
+            )
+            for start, end, tariff in zip(
+                self.starts, self.ends, self.tariffs, strict=True
+            )
+        ]
+
+    def tariff_at(self, minute: int) -> str | None:
+        """Return the tariff code active at the minute."""
+        if not self.tariffs:
+            return None
+        # Outside of any period, fall back to the last one
+        return self.tariffs[self.index_at(minute)]
+
+    def next_change(self, minute: int) -> int:
+        """Return the first period boundary after the minute.
+
+        Falls back to the end of the day when no boundary is left.
+        """
+        i = bisect_right(self.starts, minute)
+        candidates = [MINUTES_PER_DAY]
+        if i < len(self.starts):
+            candidates.append(self.starts[i])
+        if i > 0 and self.ends[i - 1] > minute:
+            candidates.append(self.ends[i - 1])
+        return min(candidates)
+
+
+@dataclass
+class HdoScheduleDiff:
+    """Changes between two schedules of the same day."""
+
+    added: list[HdoPeriod] = field(default_factory=list)
+    removed: list[HdoPeriod] = field(default_factory=list)
+    # Blocks whose tariff stayed but whose bounds moved, as (old, new)
+    shifted: list[tuple[HdoPeriod, HdoPeriod]] = field(default_factory=list)
 
-    for period in periods:
-        in_period = False
-        if period.end == time(0, 0):
-            in_period = now >= period.start
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.shifted)
+
+
+def diff_schedules(old: HdoSchedule, new: HdoSchedule) -> HdoScheduleDiff:
+    """Return the blocks added, removed and shifted between two schedules.
+
+    Adjacent periods of the same tariff are merged first, so a block that
+    is only published split differently is no change. Unmatched blocks of
+    the same tariff that overlap are paired as shifted.
+    """
+
+    def _blocks(schedule: HdoSchedule) -> list[tuple[int, int, str]]:
+        timeline = HdoTimeline.stitch([schedule])
+        return list(zip(timeline.starts, timeline.ends, timeline.tariffs, strict=True))
+
+    def _period(block: tuple[int, int, str]) -> HdoPeriod:
+        start, end, tariff = block
+        return HdoPeriod(tariff, time_of_minute(start), time_of_minute(end))
+
+    old_blocks, new_blocks = _blocks(old), _blocks(new)
+    unchanged = set(old_blocks).intersection(new_blocks)
+    removed = [b for b in old_blocks if b not in unchanged]
+    added = [b for b in new_blocks if b not in unchanged]
+
+    diff = HdoScheduleDiff()
+    for old_block in removed:
+        for new_block in added:
+            if (
+                old_block[2] == new_block[2]
+                and old_block[0] < new_block[1]
+                and new_block[0] < old_block[1]
+            ):
+                diff.shifted.append((_period(old_block), _period(new_block)))
+                added.remove(new_block)
+                break
         else:
-            in_period = period.start <= now < period.end
-
-        if in_period:
-            if period.end == time(0, 0):
-                # Minutes until midnight
-                now_minutes = now.hour * 60 + now.minute
-                return 24 * 60 - now_minutes
-            end_minutes = period.end.hour * 60 + period.end.minute
-            now_minutes = now.hour * 60 + now.minute
-            return end_minutes - now_minutes
-
-    return 0
+            diff.removed.append(_period(old_block))
+    diff.added = [_period(block) for block in added]
+    return diff
+
+
+def compile_schedule(periods: list[HdoPeriod] | HdoSchedule) -> HdoSchedule:
+    """Return periods as a compiled schedule, compiling only if needed."""
+    if isinstance(periods, HdoSchedule):
+        return periods
+    return HdoSchedule.from_periods(periods)
+
+
+def get_current_tariff(periods: list[HdoPeriod] | HdoSchedule, now: time) -> str | None:
+    """Return the current tariff code ("NT" or "VT") at the given time."""
+    return compile_schedule(periods).tariff_at(minute_of_day(now))
+
+
+def get_time_remaining(periods: list[HdoPeriod] | HdoSchedule, now: time) -> int:
+    """Return minutes remaining in the current tariff period."""
+    return compile_schedule(periods).remaining(minute_of_day(now))
+
+
+def get_next_change(periods: list[HdoPeriod] | HdoSchedule, now: time) -> int:
+    """Return the minute of day (1-1440) of the next period boundary after now.
+
+    1440 stands for the coming midnight, which is also returned when there
+    are no periods or no boundary is left today.
+    """
+    return compile_schedule(periods).next_change(minute_of_day(now))
@@ -2,19 +2,23 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
-    SensorEntity,
+    RestoreSensor,
+    SensorDeviceClass,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfTime
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_RECEIVER_COMMAND_ID, DOMAIN
+from .const import DOMAIN
 from .coordinator import PreHdoCoordinator
 
 if TYPE_CHECKING:
+    from datetime import datetime
+
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -27,20 +31,26 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensor entities from a config entry."""
-    coordinator = entry.runtime_data
-    command_id = entry.data[CONF_RECEIVER_COMMAND_ID]
-
     async_add_entities(
-        [
+        entity
+        for command_id, coordinator in entry.runtime_data.coordinators.items()
+        for entity in (
             HdoMinutesToLowTariffSensor(coordinator, command_id),
             HdoMinutesToHighTariffSensor(coordinator, command_id),
             HdoCurrentTariffSensor(coordinator, command_id),
-        ]
+            HdoNextLowTariffSensor(coordinator, command_id),
+            HdoNextHighTariffSensor(coordinator, command_id),
+            HdoTariffEndsSensor(coordinator, command_id),
+            HdoLastSuccessSensor(coordinator, command_id),
+        )
     )
 
 
-class HdoBaseSensor(CoordinatorEntity[PreHdoCoordinator], SensorEntity):
-    """Base class for HDO sensors."""
+class HdoBaseSensor(CoordinatorEntity[PreHdoCoordinator], RestoreSensor):
+    """Base class for HDO sensors.
+
+    Until the coordinator has data, the sensors show their last known value.
+    """
 
     _attr_has_entity_name = True
 
@@ -56,14 +66,41 @@ class HdoBaseSensor(CoordinatorEntity[PreHdoCoordinator], SensorEntity):
             "name": f"PRE Distribuce HDO {command_id}",
             "manufacturer": "PREdistribuce, a.s.",
         }
+        self._last_written: tuple[bool, object] | None = None
+        self._restored_value: Any = None
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known value."""
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_sensor_data()) is not None:
+            self._restored_value = last.native_value
 
-class HdoMinutesToLowTariffSensor(HdoBaseSensor):
-    """Sensor showing minutes until low tariff starts."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if this entity's value changed."""
+        state = (self.available, self.native_value)
+        if state == self._last_written:
+            return
+        self._last_written = state
+        self.async_write_ha_state()
+
+
+class HdoCountdownSensor(HdoBaseSensor):
+    """Base class for sensors counting down minutes between boundaries."""
 
-    _attr_icon = "mdi:clock-start"
     _attr_native_unit_of_measurement = UnitOfTime.MINUTES
     _attr_state_class = SensorStateClass.MEASUREMENT
+
+    async def async_added_to_hass(self) -> None:
+        """Join the coordinator's minute tick while the entity is added."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_track_minute_ticks())
+
+
+class HdoMinutesToLowTariffSensor(HdoCountdownSensor):
+    """Sensor showing minutes until low tariff starts."""
+
+    _attr_icon = "mdi:clock-start"
     _attr_translation_key = "minutes_to_low_tariff"
 
     def __init__(self, coordinator: PreHdoCoordinator, command_id: str) -> None:
@@ -73,16 +110,14 @@ class HdoMinutesToLowTariffSensor(HdoBaseSensor):
     @property
     def native_value(self) -> int | None:
         if self.coordinator.data is None:
-            return None
+            return self._restored_value
         return self.coordinator.data.minutes_to_low_tariff
 
 
-class HdoMinutesToHighTariffSensor(HdoBaseSensor):
+class HdoMinutesToHighTariffSensor(HdoCountdownSensor):
     """Sensor showing minutes until high tariff starts."""
 
     _attr_icon = "mdi:clock-end"
-    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
-    _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_translation_key = "minutes_to_high_tariff"
 
     def __init__(self, coordinator: PreHdoCoordinator, command_id: str) -> None:
@@ -92,7 +127,7 @@ class HdoMinutesToHighTariffSensor(HdoBaseSensor):
     @property
     def native_value(self) -> int | None:
         if self.coordinator.data is None:
-            return None
+            return self._restored_value
         return self.coordinator.data.minutes_to_high_tariff
 
 
@@ -109,5 +144,88 @@ class HdoCurrentTariffSensor(HdoBaseSensor):
     @property
     def native_value(self) -> str | None:
         if self.coordinator.data is None:
-            return None
+            return self._restored_value
         return self.coordinator.data.current_tariff
+
+
+class HdoTransitionSensor(HdoBaseSensor):
+    """Base class for sensors with the time of a tariff transition.
+
+    Unlike the countdowns they do not follow the minute tick, their state
+    only changes when a block starts or ends.
+    """
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+
+class HdoNextLowTariffSensor(HdoTransitionSensor):
+    """Sensor showing when the next low tariff block starts."""
+
+    _attr_icon = "mdi:clock-start"
+    _attr_translation_key = "next_low_tariff"
+
+    def __init__(self, coordinator: PreHdoCoordinator, command_id: str) -> None:
+        super().__init__(coordinator, command_id)
+        self._attr_unique_id = f"pre-hdo_{command_id}_next_low"
+
+    @property
+    def native_value(self) -> datetime | None:
+        if self.coordinator.data is None:
+            return self._restored_value
+        return self.coordinator.data.next_low_tariff
+
+
+class HdoNextHighTariffSensor(HdoTransitionSensor):
+    """Sensor showing when the next high tariff block starts."""
+
+    _attr_icon = "mdi:clock-end"
+    _attr_translation_key = "next_high_tariff"
+
+    def __init__(self, coordinator: PreHdoCoordinator, command_id: str) -> None:
+        super().__init__(coordinator, command_id)
+        self._attr_unique_id = f"pre-hdo_{command_id}_next_high"
+
+    @property
+    def native_value(self) -> datetime | None:
+        if self.coordinator.data is None:
+            return self._restored_value
+        return self.coordinator.data.next_high_tariff
+
+
+class HdoTariffEndsSensor(HdoTransitionSensor):
+    """Sensor showing when the current tariff block ends."""
+
+    _attr_icon = "mdi:timer-sand"
+    _attr_translation_key = "tariff_ends"
+
+    def __init__(self, coordinator: PreHdoCoordinator, command_id: str) -> None:
+        super().__init__(coordinator, command_id)
+        self._attr_unique_id = f"pre-hdo_{command_id}_tariff_ends"
+
+    @property
+    def native_value(self) -> datetime | None:
+        if self.coordinator.data is None:
+            return self._restored_value
+        return self.coordinator.data.tariff_ends
+
+
+class HdoLastSuccessSensor(HdoBaseSensor):
+    """Sensor showing when the schedule was last fetched successfully.
+
+    While PRE Distribuce is unreachable the other entities keep serving the
+    cached schedule, and this timestamp shows how old it is.
+    """
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_translation_key = "last_success"
+
+    def __init__(self, coordinator: PreHdoCoordinator, command_id: str) -> None:
+        super().__init__(coordinator, command_id)
+        self._attr_unique_id = f"pre-hdo_{command_id}_last_success"
+
+    @property
+    def native_value(self) -> datetime | None:
+        if self.coordinator.data is None:
+            return self._restored_value
+        return self.coordinator.data.last_success
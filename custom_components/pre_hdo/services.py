@@ -0,0 +1,172 @@
+"""Services for PRE Distribuce HDO."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import CONF_PERIOD_MINUTES, CONF_PERIOD_NAME, CONF_PERIODS, DOMAIN
+from .coordinator import timeline_datetime, timeline_minute
+from .parser import periods_as_dicts
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from . import PreHdoConfigEntry
+    from .coordinator import PreHdoCoordinator
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_COMMAND_ID = "command_id"
+ATTR_MINUTES = "minutes"
+ATTR_APPLIANCE = "appliance"
+
+SERVICE_GET_SCHEDULE = "get_schedule"
+SERVICE_FIND_WINDOW = "find_window"
+
+GET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_COMMAND_ID): cv.string,
+    }
+)
+
+FIND_WINDOW_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_COMMAND_ID): cv.string,
+            vol.Exclusive(ATTR_MINUTES, "duration"): vol.All(
+                vol.Coerce(int), vol.Range(min=1)
+            ),
+            vol.Exclusive(ATTR_APPLIANCE, "duration"): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_MINUTES, ATTR_APPLIANCE),
+)
+
+
+def _get_entry(hass: HomeAssistant, call: ServiceCall) -> PreHdoConfigEntry:
+    """Return the loaded config entry targeted by a service call."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    entry: PreHdoConfigEntry | None = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_found",
+            translation_placeholders={"entry_id": entry_id},
+        )
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_loaded",
+            translation_placeholders={"entry_id": entry_id},
+        )
+    return entry
+
+
+def _get_coordinator(entry: PreHdoConfigEntry, call: ServiceCall) -> PreHdoCoordinator:
+    """Return the coordinator of the receiver targeted by a service call.
+
+    The command ID may be left out for entries with a single receiver.
+    """
+    coordinators = entry.runtime_data.coordinators
+    if (command_id := call.data.get(ATTR_COMMAND_ID)) is None:
+        if len(coordinators) == 1:
+            return next(iter(coordinators.values()))
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="command_id_required",
+        )
+    if (coordinator := coordinators.get(command_id)) is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="command_id_not_found",
+            translation_placeholders={"command_id": command_id},
+        )
+    return coordinator
+
+
+def _get_run_minutes(entry: PreHdoConfigEntry, call: ServiceCall) -> int:
+    """Return the job length of a call, given directly or by appliance name."""
+    if ATTR_MINUTES in call.data:
+        return call.data[ATTR_MINUTES]
+
+    name = call.data[ATTR_APPLIANCE]
+    # Appliances are identified by slug, as their entities
+    slug = slugify(name)
+    for appliance in entry.options.get(CONF_PERIODS, []):
+        if slugify(appliance[CONF_PERIOD_NAME]) == slug:
+            return appliance[CONF_PERIOD_MINUTES]
+    raise ServiceValidationError(
+        translation_domain=DOMAIN,
+        translation_key="appliance_not_found",
+        translation_placeholders={"appliance": name},
+    )
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    @callback
+    def _async_get_schedule(call: ServiceCall) -> ServiceResponse:
+        """Return today's and the prefetched future schedules."""
+        coordinator = _get_coordinator(_get_entry(hass, call), call)
+        today = dt_util.now().date()
+        return {
+            "command_id": coordinator.command_id,
+            "days": [
+                {
+                    "date": day.isoformat(),
+                    "periods": periods_as_dicts(schedule.periods),
+                }
+                for day, schedule in sorted(coordinator.days.items())
+                if day >= today
+            ],
+        }
+
+    @callback
+    def _async_find_window(call: ServiceCall) -> ServiceResponse:
+        """Return the earliest start fitting a job entirely into low tariff."""
+        entry = _get_entry(hass, call)
+        coordinator = _get_coordinator(entry, call)
+        minutes = _get_run_minutes(entry, call)
+
+        now = dt_util.now()
+        today = now.date()
+        start = None
+        if today in coordinator.days:
+            timeline = coordinator.async_get_timeline(today)
+            # A start in the current minute would already be in the past
+            start = timeline.find_low_window(
+                timeline_minute(today, now, round_up=True), minutes
+            )
+        if start is None:
+            return {"minutes": minutes, "start": None, "end": None}
+        return {
+            "minutes": minutes,
+            "start": timeline_datetime(today, start).isoformat(),
+            "end": timeline_datetime(today, start + minutes).isoformat(),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SCHEDULE,
+        _async_get_schedule,
+        schema=GET_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_WINDOW,
+        _async_find_window,
+        schema=FIND_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,193 @@
+"""Long-term statistics of the daily tariffs of PRE Distribuce HDO."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfTime
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+from homeassistant.util.unit_conversion import DurationConverter
+
+from .const import DOMAIN, TARIFF_HIGH, TARIFF_LOW
+from .parser import HdoTimeline
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from datetime import date
+
+    from homeassistant.core import HomeAssistant
+
+    from .parser import HdoSchedule
+
+_LOGGER = logging.getLogger(__name__)
+
+# Statistics per receiver, each with one row per day at local midnight
+STATISTIC_LOW_MINUTES = "low_tariff_minutes"
+STATISTIC_HIGH_MINUTES = "high_tariff_minutes"
+STATISTIC_SWITCHES = "tariff_switches"
+
+
+@dataclass(frozen=True, slots=True)
+class DayTariffStats:
+    """Tariff totals of one day."""
+
+    low_minutes: int
+    high_minutes: int
+    # Changes between NT and VT, including one at midnight
+    switches: int
+    # Tariff at the end of the day, for the switch count of the next one
+    last_tariff: str | None
+
+
+def day_tariff_stats(
+    schedule: HdoSchedule, previous_tariff: str | None = None
+) -> DayTariffStats:
+    """Return the tariff totals of a day's schedule.
+
+    Adjacent periods of the same tariff are merged first, so only real
+    changes count as switches. A change at midnight counts if the tariff at
+    the end of the previous day is given.
+    """
+    timeline = HdoTimeline.stitch([schedule])
+    minutes = dict.fromkeys((TARIFF_LOW, TARIFF_HIGH), 0)
+    for start, end, tariff in zip(
+        timeline.starts, timeline.ends, timeline.tariffs, strict=True
+    ):
+        minutes[tariff] = minutes.get(tariff, 0) + end - start
+
+    switches = max(len(timeline.tariffs) - 1, 0)
+    if previous_tariff is not None and timeline.tariffs:
+        switches += previous_tariff != timeline.tariffs[0]
+    return DayTariffStats(
+        low_minutes=minutes[TARIFF_LOW],
+        high_minutes=minutes[TARIFF_HIGH],
+        switches=switches,
+        last_tariff=timeline.tariffs[-1] if timeline.tariffs else previous_tariff,
+    )
+
+
+class PreHdoStatistics:
+    """Imports the daily tariff totals of one receiver into the recorder.
+
+    Each day is imported once, when it has become today, as an external
+    statistic with a running sum. Only the last imported row is read back,
+    once per start, to continue the sums.
+    """
+
+    def __init__(self, hass: HomeAssistant, command_id: str) -> None:
+        self.hass = hass
+        self.command_id = command_id
+        object_id = slugify(command_id)
+        self._metadata = {
+            key: StatisticMetaData(
+                mean_type=StatisticMeanType.NONE,
+                has_sum=True,
+                name=f"PRE HDO {command_id} {name}",
+                source=DOMAIN,
+                statistic_id=f"{DOMAIN}:{object_id}_{key}",
+                unit_class=unit_class,
+                unit_of_measurement=unit,
+            )
+            for key, name, unit, unit_class in (
+                (
+                    STATISTIC_LOW_MINUTES,
+                    "low tariff minutes",
+                    UnitOfTime.MINUTES,
+                    DurationConverter.UNIT_CLASS,
+                ),
+                (
+                    STATISTIC_HIGH_MINUTES,
+                    "high tariff minutes",
+                    UnitOfTime.MINUTES,
+                    DurationConverter.UNIT_CLASS,
+                ),
+                (STATISTIC_SWITCHES, "tariff switches", None, None),
+            )
+        }
+        self._sums: dict[str, float] | None = None
+        self._last_day: date | None = None
+        self._last_tariff: str | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_import(self, days: Mapping[date, HdoSchedule], today: date) -> None:
+        """Import the cached days up to today that are not imported yet."""
+        if self._last_day is not None and self._last_day >= today:
+            return
+        async with self._lock:
+            if self._sums is None:
+                self._sums = await self._async_load_last()
+            sums = self._sums
+
+            pending = sorted(
+                day
+                for day in days
+                if day <= today and (self._last_day is None or day > self._last_day)
+            )
+            if not pending:
+                return
+
+            rows: dict[str, list[StatisticData]] = {key: [] for key in self._metadata}
+            for day in pending:
+                # The midnight switch is only known after the previous day
+                previous = (
+                    self._last_tariff
+                    if self._last_day == day - timedelta(days=1)
+                    else None
+                )
+                stats = day_tariff_stats(days[day], previous)
+                start = dt_util.start_of_local_day(day)
+                for key, value in (
+                    (STATISTIC_LOW_MINUTES, stats.low_minutes),
+                    (STATISTIC_HIGH_MINUTES, stats.high_minutes),
+                    (STATISTIC_SWITCHES, stats.switches),
+                ):
+                    sums[key] += value
+                    rows[key].append(
+                        StatisticData(start=start, state=value, sum=sums[key])
+                    )
+                self._last_day = day
+                self._last_tariff = stats.last_tariff
+
+            for key, metadata in self._metadata.items():
+                async_add_external_statistics(self.hass, metadata, rows[key])
+            _LOGGER.debug(
+                "Imported tariff statistics of %s for %s",
+                self.command_id,
+                ", ".join(day.isoformat() for day in pending),
+            )
+
+    async def _async_load_last(self) -> dict[str, float]:
+        """Return the sums of the last imported rows, and note their day."""
+        sums: dict[str, float] = {}
+        for key, metadata in self._metadata.items():
+            statistic_id = metadata["statistic_id"]
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics,
+                self.hass,
+                1,
+                statistic_id,
+                True,  # noqa: FBT003
+                {"sum"},
+            )
+            row = last[statistic_id][0] if last.get(statistic_id) else None
+            sums[key] = (row.get("sum") or 0.0) if row else 0.0
+            if row is not None and key == STATISTIC_LOW_MINUTES:
+                self._last_day = dt_util.as_local(
+                    dt_util.utc_from_timestamp(row["start"])
+                ).date()
+        return sums
@@ -0,0 +1,144 @@
+"""Persistent schedule cache for PRE Distribuce HDO."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .parser import HdoPeriod
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.schedules"
+SAVE_DELAY = 10
+
+# Days before today that are kept in the cache
+KEEP_PAST_DAYS = 1
+
+DATA_STORE: HassKey[PreHdoScheduleStore] = HassKey(f"{DOMAIN}_store")
+
+StoredPeriod = list[str]
+StoredSchedules = dict[str, dict[str, list[StoredPeriod]]]
+StoredData = dict[str, StoredSchedules | dict[str, str]]
+
+
+def periods_to_storage(periods: list[HdoPeriod]) -> list[StoredPeriod]:
+    """Serialise periods into compact JSON-friendly lists.
+
+    The strings are interned, as the same few repeat across days and receivers.
+    """
+    return [
+        [
+            sys.intern(p.tariff),
+            sys.intern(p.start.strftime("%H:%M")),
+            sys.intern(p.end.strftime("%H:%M")),
+        ]
+        for p in periods
+    ]
+
+
+def periods_from_storage(stored: list[StoredPeriod]) -> list[HdoPeriod]:
+    """Rebuild periods from their stored representation."""
+    return [
+        HdoPeriod(
+            tariff=tariff,
+            start=time.fromisoformat(start),
+            end=time.fromisoformat(end),
+        )
+        for tariff, start, end in stored
+    ]
+
+
+class PreHdoScheduleStore:
+    """Parsed HDO periods cached on disk per receiver command ID and date."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[StoredData] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._schedules: StoredSchedules = {}
+        # Time of the last successful fetch per command ID, in ISO format
+        self._last_success: dict[str, str] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    async def async_load(self) -> None:
+        """Load cached schedules from disk, once."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load()
+            if data is not None:
+                self._schedules = data.get("schedules", {})
+                self._last_success = data.get("last_success", {})
+            self._loaded = True
+
+    def get_schedule(self, command_id: str, since: date) -> dict[date, list[HdoPeriod]]:
+        """Return cached periods for a command ID from the given date onwards."""
+        schedule: dict[date, list[HdoPeriod]] = {}
+        for day_str, stored in self._schedules.get(command_id, {}).items():
+            day = date.fromisoformat(day_str)
+            if day < since:
+                continue
+            try:
+                schedule[day] = periods_from_storage(stored)
+            except (TypeError, ValueError):
+                _LOGGER.warning(
+                    "Ignoring corrupt cached schedule for %s on %s", command_id, day
+                )
+        return schedule
+
+    def has_periods(self, command_id: str, day: date) -> bool:
+        """Return whether a non-empty schedule is cached for a command ID and date."""
+        return bool(self._schedules.get(command_id, {}).get(day.isoformat()))
+
+    @callback
+    def async_set_periods(
+        self, command_id: str, day: date, periods: list[HdoPeriod]
+    ) -> None:
+        """Cache periods for a command ID and date and schedule a save."""
+        days = self._schedules.setdefault(command_id, {})
+        days[day.isoformat()] = periods_to_storage(periods)
+
+        today = dt_util.now().date()
+        oldest = (today - timedelta(days=KEEP_PAST_DAYS)).isoformat()
+        for stored_day in [d for d in days if d < oldest]:
+            del days[stored_day]
+
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get_last_success(self, command_id: str) -> datetime | None:
+        """Return when a schedule for a command ID was last fetched."""
+        if (stored := self._last_success.get(command_id)) is None:
+            return None
+        return dt_util.parse_datetime(stored)
+
+    @callback
+    def async_set_last_success(self, command_id: str, when: datetime) -> None:
+        """Record a successful fetch for a command ID and schedule a save."""
+        self._last_success[command_id] = when.isoformat()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> StoredData:
+        """Return data to persist."""
+        return {"schedules": self._schedules, "last_success": self._last_success}
+
+
+async def async_get_schedule_store(hass: HomeAssistant) -> PreHdoScheduleStore:
+    """Return the loaded schedule store shared by all config entries."""
+    if (store := hass.data.get(DATA_STORE)) is None:
+        store = hass.data[DATA_STORE] = PreHdoScheduleStore(hass)
+    await store.async_load()
+    return store
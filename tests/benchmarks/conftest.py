@@ -0,0 +1,147 @@
+"""Synthetic fixtures and timing helpers for the benchmark suite.
+
+Benchmarks are skipped unless PRE_HDO_BENCHMARK is set:
+
+    PRE_HDO_BENCHMARK=1 uv run pytest tests/benchmarks
+        compare against baselines.json, fail above the threshold
+    PRE_HDO_BENCHMARK=update uv run pytest tests/benchmarks
+        record new baselines
+
+Timings are stored relative to a fixed pure-Python calibration workload
+measured right after each benchmark, so baselines recorded on a desktop remain
+meaningful on slower hardware like a Raspberry Pi.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import timeit
+from datetime import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from custom_components.pre_hdo.parser import HdoPeriod
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+MODE = os.environ.get("PRE_HDO_BENCHMARK", "")
+# Allowed slowdown against the baseline before a benchmark fails
+THRESHOLD = float(os.environ.get("PRE_HDO_BENCHMARK_THRESHOLD", "2.0"))
+REPEAT = 7
+# Minimum duration of one timed repeat, short ones are dominated by noise
+MIN_REPEAT_SECONDS = 0.02
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Skip the benchmarks unless they were asked for."""
+    if MODE:
+        return
+    skip = pytest.mark.skip(reason="set PRE_HDO_BENCHMARK to run benchmarks")
+    for item in items:
+        if item.path.parent == BASELINES_PATH.parent:
+            item.add_marker(skip)
+
+
+def synthetic_periods(count: int) -> list[HdoPeriod]:
+    """Return a day split into count alternating periods, VT first."""
+    bounds = [round(i * 1440 / count) for i in range(count + 1)]
+    return [
+        HdoPeriod(
+            tariff="NT" if i % 2 else "VT",
+            start=time(*divmod(bounds[i], 60)),
+            end=time(*divmod(bounds[i + 1] % 1440, 60)),
+        )
+        for i in range(count)
+    ]
+
+
+def synthetic_html(count: int) -> str:
+    """Return an AJAX HTML fragment as served by PRE with count periods."""
+    parts = ['<div class="hdo-bar"><div class="overflow-bar"></div>']
+    for period in synthetic_periods(count):
+        left = f"{(period.start.hour * 60 + period.start.minute) / 14.4:.2f}%"
+        parts.append(
+            f'<span style="left: {left};" class="hdo{period.tariff.lower()}"></span>'
+            f'<span style="left: {left};" class="span-overflow" '
+            f'title="{period.start:%H:%M} - {period.end:%H:%M}"></span>'
+        )
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def _calibrate() -> float:
+    """Return the time of a fixed workload, the unit of all results."""
+
+    def workload() -> None:
+        values = {}
+        for i in range(2000):
+            values[i] = str(i)
+        sorted(values.values())
+
+    return min(timeit.repeat(workload, number=20, repeat=REPEAT)) / 20
+
+
+class BenchmarkRecorder:
+    """Time callables and compare the results against stored baselines."""
+
+    def __init__(self) -> None:
+        self.baselines: dict[str, float] = {}
+        if BASELINES_PATH.exists():
+            self.baselines = json.loads(BASELINES_PATH.read_text())
+        self.results: dict[str, float] = {}
+
+    def __call__(self, name: str, func: Callable[[], object]) -> None:
+        """Time func, record it under name and check it against the baseline."""
+        timer = timeit.Timer(func)
+        number = 1
+        while timer.timeit(number) < MIN_REPEAT_SECONDS:
+            number *= 2
+        seconds = min(timer.repeat(number=number, repeat=REPEAT)) / number
+        # Calibrated next to each measurement to follow CPU frequency changes
+        score = seconds / _calibrate()
+        self.results[name] = score
+        if MODE == "update":
+            return
+        if (baseline := self.baselines.get(name)) is None:
+            pytest.fail(f"No baseline for {name}, run with PRE_HDO_BENCHMARK=update")
+        if score > baseline * THRESHOLD:
+            pytest.fail(
+                f"{name} regressed: {score:.3f} vs baseline {baseline:.3f} "
+                f"(threshold {THRESHOLD}x)"
+            )
+
+    def save(self) -> None:
+        """Merge the recorded results into the baselines file."""
+        baselines = {
+            **self.baselines,
+            **{name: round(score, 4) for name, score in self.results.items()},
+        }
+        BASELINES_PATH.write_text(
+            json.dumps(dict(sorted(baselines.items())), indent=2) + "\n"
+        )
+
+
+@pytest.fixture
+def make_periods() -> Callable[[int], list[HdoPeriod]]:
+    """Return the synthetic period factory."""
+    return synthetic_periods
+
+
+@pytest.fixture
+def make_html() -> Callable[[int], str]:
+    """Return the synthetic HTML factory."""
+    return synthetic_html
+
+
+@pytest.fixture(scope="session")
+def bench() -> Iterator[BenchmarkRecorder]:
+    """Return the session's benchmark recorder."""
+    recorder = BenchmarkRecorder()
+    yield recorder
+    if MODE == "update":
+        recorder.save()
@@ -0,0 +1,145 @@
+"""Benchmarks for parsing, schedule math and entity attribute generation."""
+
+import json
+from dataclasses import replace
+from datetime import date, time
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.pre_hdo.binary_sensor import HdoTariffBinarySensor
+from custom_components.pre_hdo.calendar import timeline_events
+from custom_components.pre_hdo.coordinator import process_periods
+from custom_components.pre_hdo.parser import (
+    HdoSchedule,
+    HdoTimeline,
+    get_current_tariff,
+    parse_hdo_periods,
+)
+
+# Periods per day: the usual schedule, hourly switching and 5-minute blocks
+PERIOD_COUNTS = (5, 24, 288)
+DAY_COUNTS = (1, 7, 31)
+# Times of day every lookup benchmark sweeps over, one per quarter hour
+SWEEP = [time(*divmod(minute, 60)) for minute in range(0, 1440, 15)]
+COMMAND_IDS = [str(100 + i) for i in range(200)]
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+def test_parse_html(bench, make_html, count) -> None:
+    html = make_html(count)
+    assert len(parse_hdo_periods(html)) == count
+    bench(f"parse_html[{count}]", lambda: parse_hdo_periods(html))
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+def test_parse_raw_body(bench, make_html, count) -> None:
+    body = json.dumps({"html": make_html(count)}).encode()
+    assert len(parse_hdo_periods(body)) == count
+    bench(f"parse_raw_body[{count}]", lambda: parse_hdo_periods(body))
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+def test_compile_schedule(bench, make_periods, count) -> None:
+    periods = make_periods(count)
+    bench(f"compile_schedule[{count}]", lambda: HdoSchedule.from_periods(periods))
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+@pytest.mark.parametrize("days", DAY_COUNTS)
+def test_stitch_timeline(bench, make_periods, days, count) -> None:
+    schedule = HdoSchedule.from_periods(make_periods(count))
+    bench(
+        f"stitch_timeline[{days}d-{count}]",
+        lambda: HdoTimeline.stitch([schedule] * days),
+    )
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+@pytest.mark.parametrize("days", DAY_COUNTS)
+def test_process_periods(bench, make_periods, days, count) -> None:
+    schedule = HdoSchedule.from_periods(make_periods(count))
+    timeline = HdoTimeline.stitch([schedule] * days)
+
+    def sweep() -> None:
+        for now in SWEEP:
+            process_periods(schedule, now, timeline)
+
+    bench(f"process_periods[{days}d-{count}]", sweep)
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+@pytest.mark.parametrize("days", DAY_COUNTS)
+def test_calendar_events(bench, make_periods, days, count) -> None:
+    """Low tariff events of one day, queried for every cached day."""
+    schedule = HdoSchedule.from_periods(make_periods(count))
+    timeline = HdoTimeline.stitch([schedule] * days)
+    today = date(2024, 1, 15)
+
+    def query() -> None:
+        for day in range(days):
+            timeline_events(timeline, today, day * 1440, (day + 1) * 1440, "NT")
+
+    bench(f"calendar_events[{days}d-{count}]", query)
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+def test_get_current_tariff_compiled(bench, make_periods, count) -> None:
+    schedule = HdoSchedule.from_periods(make_periods(count))
+
+    def sweep() -> None:
+        for now in SWEEP:
+            get_current_tariff(schedule, now)
+
+    bench(f"get_current_tariff_compiled[{count}]", sweep)
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+def test_get_current_tariff_list(bench, make_periods, count) -> None:
+    periods = make_periods(count)
+
+    def sweep() -> None:
+        for now in SWEEP[:8]:
+            get_current_tariff(periods, now)
+
+    bench(f"get_current_tariff_list[{count}]", sweep)
+
+
+def _sensors(make_periods, count):
+    """Return a low tariff sensor with data for every command ID."""
+    schedule = HdoSchedule.from_periods(make_periods(count))
+    data = process_periods(schedule, time(12, 0))
+    sensors = []
+    for command_id in COMMAND_IDS:
+        coordinator = MagicMock()
+        coordinator.data = data
+        sensors.append(HdoTariffBinarySensor(coordinator, command_id))
+    return sensors, data
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+def test_attributes_minute_tick(bench, make_periods, count) -> None:
+    """Attributes of all receivers after a tick, the schedule unchanged."""
+    sensors, data = _sensors(make_periods, count)
+    ticked = replace(data, minutes_to_next_change=data.minutes_to_next_change - 1)
+
+    def tick() -> None:
+        for sensor in sensors:
+            sensor.coordinator.data = ticked
+            sensor.extra_state_attributes  # noqa: B018
+
+    bench(f"attributes_minute_tick[{len(sensors)}x{count}]", tick)
+
+
+@pytest.mark.parametrize("count", PERIOD_COUNTS)
+def test_attributes_new_schedule(bench, make_periods, count) -> None:
+    """Attributes of all receivers after each fetched a new schedule."""
+    sensors, data = _sensors(make_periods, count)
+
+    def refresh() -> None:
+        fetched = replace(data, schedule=replace(data.schedule))
+        for sensor in sensors:
+            sensor.coordinator.data = fetched
+            sensor.extra_state_attributes  # noqa: B018
+
+    bench(f"attributes_new_schedule[{len(sensors)}x{count}]", refresh)
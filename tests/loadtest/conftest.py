@@ -0,0 +1,126 @@
+"""Local stand-in for the PRE Distribuce hdoOneDayAjax endpoint.
+
+The fake serves recorded HTML for known command IDs and synthetic schedules
+for any other ``povel``/``datum``, with configurable latency, error rate
+and payload size. Nothing here talks to the real distributor site.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import zlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import pytest
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
+ENDPOINT = "/com/PREdi/UI/Forms/Hdo/HdoForm:hdoOneDayAjax"
+
+
+@dataclass
+class FakePreConfig:
+    """Behaviour of the fake endpoint, changeable while it runs."""
+
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # up to this many seconds added on top, uniformly
+    error_rate: float = 0.0  # share of requests answered with HTTP 500
+    periods: int = 6  # periods per synthetic day
+    payload_bytes: int = 0  # minimum response size, padded with markup
+    # HTML served for a command ID instead of a synthetic schedule
+    recorded: dict[str, str] = field(default_factory=dict)
+    seed: int = 0
+
+
+def synthetic_day_html(command_id: str, date_str: str, periods: int) -> str:
+    """Return a stable synthetic schedule for a command ID and date.
+
+    Boundaries are drawn from a generator seeded by the command ID and date,
+    so repeated requests get identical payloads.
+    """
+    rng = random.Random(zlib.crc32(f"{command_id}/{date_str}".encode()))
+    bounds = sorted(rng.sample(range(15, 1440, 15), periods - 1))
+    bounds = [0, *bounds, 1440]
+
+    parts = ['<div class="hdo-bar"><div class="overflow-bar"></div>']
+    for i in range(periods):
+        start, end = bounds[i], bounds[i + 1] % 1440
+        tariff = "nt" if i % 2 else "vt"
+        left = f"{bounds[i] / 14.4:.2f}%"
+        parts.append(
+            f'<span style="left: {left};" class="hdo{tariff}"></span>'
+            f'<span style="left: {left};" class="span-overflow" '
+            f'title="{start // 60:02d}:{start % 60:02d} - '
+            f'{end // 60:02d}:{end % 60:02d}"></span>'
+        )
+    parts.append("</div>")
+    return "".join(parts)
+
+
+class FakePreServer:
+    """aiohttp server answering hdoOneDayAjax requests."""
+
+    def __init__(self, config: FakePreConfig) -> None:
+        self.config = config
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(config.seed)
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    async def start(self) -> None:
+        """Listen on a free local port."""
+        app = web.Application()
+        app.router.add_post(ENDPOINT, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}{ENDPOINT}"
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer one request according to the configuration."""
+        self.requests += 1
+        form = await request.post()
+        command_id = str(form.get("povel", ""))
+        date_str = str(form.get("datum", ""))
+
+        config = self.config
+        delay = config.latency + self._rng.uniform(0, config.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._rng.random() < config.error_rate:
+            self.errors += 1
+            return web.Response(status=500, text="Internal Server Error")
+
+        html = config.recorded.get(command_id) or synthetic_day_html(
+            command_id, date_str, config.periods
+        )
+        if (missing := config.payload_bytes - len(html)) > 0:
+            html += f'<div class="padding">{" " * missing}</div>'
+        return web.json_response({"html": html})
+
+
+@pytest.fixture
+async def fake_pre(sample_hdo_html) -> AsyncIterator[FakePreServer]:
+    """Return a running fake endpoint serving the recorded sample for 492."""
+    server = FakePreServer(FakePreConfig(recorded={"492": sample_hdo_html}))
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+def make_command_ids() -> Callable[[int], list[str]]:
+    """Return a factory of distinct command IDs."""
+    return lambda count: [str(1000 + i) for i in range(count)]
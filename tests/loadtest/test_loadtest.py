@@ -0,0 +1,207 @@
+"""Load tests driving the client and coordinators against the fake endpoint.
+
+A small configuration runs with the regular suite so the harness keeps
+working. Set PRE_HDO_LOADTEST=1 for hundreds of receivers, and run with
+``-s`` to see the reports:
+
+    PRE_HDO_LOADTEST=1 uv run pytest tests/loadtest -s
+"""
+
+import asyncio
+import os
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import ClientSession
+from homeassistant.util import dt as dt_util
+
+from custom_components.pre_hdo.api_client import FAILURE_THRESHOLD, PreHdoApiClient
+from custom_components.pre_hdo.const import MAX_CONCURRENT_REQUESTS, PREFETCH_DAYS
+from custom_components.pre_hdo.coordinator import PreHdoCoordinator
+from custom_components.pre_hdo.hub import PreHdoHub
+
+FULL = bool(os.environ.get("PRE_HDO_LOADTEST"))
+RECEIVER_COUNTS = (100, 300, 500) if FULL else (10,)
+CONCURRENCY = (MAX_CONCURRENT_REQUESTS, 10, 30) if FULL else (MAX_CONCURRENT_REQUESTS,)
+LATENCY = 0.02 if FULL else 0.001
+JITTER = 0.03 if FULL else 0.0
+
+
+def _percentile(values: list[float], share: float) -> float:
+    """Return the nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def _report(title: str, wall: float, requests: int, latencies) -> None:
+    """Print throughput and tail latency of a run."""
+    print(  # noqa: T201
+        f"\n{title}: {requests} requests in {wall:.2f} s "
+        f"({requests / wall:.0f} req/s), latency ms "
+        f"p50 {_percentile(latencies, 0.5) * 1000:.1f} "
+        f"p95 {_percentile(latencies, 0.95) * 1000:.1f} "
+        f"p99 {_percentile(latencies, 0.99) * 1000:.1f} "
+        f"max {max(latencies) * 1000:.1f}"
+    )
+
+
+def _make_hub(client: PreHdoApiClient) -> PreHdoHub:
+    loop = asyncio.get_running_loop()
+    hass = MagicMock()
+    hass.loop = loop
+    hass.async_create_background_task = lambda coro, _name: loop.create_task(coro)
+    store = MagicMock()
+    store.get_last_success.return_value = None
+    return PreHdoHub(hass, client, store)
+
+
+def _prefetch_days() -> list:
+    today = dt_util.now().date()
+    return [today + timedelta(days=offset) for offset in range(PREFETCH_DAYS)]
+
+
+class TestFakeEndpoint:
+    async def test_serves_recorded_and_synthetic(self, fake_pre) -> None:
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session, url=fake_pre.url)
+            recorded = await client.async_get_hdo_periods("492", "13.02.2026")
+            digest, synthetic = await client.async_get_hdo_day("1234", "13.02.2026")
+            again = await client.async_get_hdo_day("1234", "13.02.2026", digest)
+        assert len(recorded) == 5
+        assert len(synthetic) == fake_pre.config.periods
+        # Stable payloads are recognised by their digest
+        assert again == (digest, None)
+
+    async def test_payload_size(self, fake_pre) -> None:
+        fake_pre.config.payload_bytes = 50_000
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session, url=fake_pre.url)
+            periods = await client.async_get_hdo_periods("1234", "13.02.2026")
+        assert len(periods) == fake_pre.config.periods
+        assert client.metrics.bytes_received > 50_000
+
+
+class TestLoad:
+    @pytest.mark.parametrize("concurrency", CONCURRENCY)
+    @pytest.mark.parametrize("receivers", RECEIVER_COUNTS)
+    async def test_client_throughput(
+        self, fake_pre, make_command_ids, receivers, concurrency
+    ) -> None:
+        fake_pre.config.latency = LATENCY
+        fake_pre.config.jitter = JITTER
+        days = _prefetch_days()
+        latencies: list[float] = []
+
+        async with ClientSession() as session:
+            client = PreHdoApiClient(
+                session, max_concurrency=concurrency, url=fake_pre.url
+            )
+
+            async def _receiver(command_id: str) -> int:
+                started = time.perf_counter()
+                batch = await client.async_get_hdo_periods_batch(command_id, days)
+                latencies.append(time.perf_counter() - started)
+                return len(batch.periods)
+
+            started = time.perf_counter()
+            fetched = await asyncio.gather(
+                *(_receiver(command_id) for command_id in make_command_ids(receivers))
+            )
+            wall = time.perf_counter() - started
+
+        assert sum(fetched) == receivers * PREFETCH_DAYS
+        _report(
+            f"client {receivers} receivers, concurrency {concurrency}",
+            wall,
+            fake_pre.requests,
+            latencies,
+        )
+
+    @pytest.mark.parametrize("receivers", RECEIVER_COUNTS)
+    async def test_coordinator_refresh(
+        self, fake_pre, make_command_ids, receivers
+    ) -> None:
+        fake_pre.config.latency = LATENCY
+        fake_pre.config.jitter = JITTER
+        latencies: list[float] = []
+
+        async with ClientSession() as session:
+            hub = _make_hub(PreHdoApiClient(session, url=fake_pre.url))
+            # Two entries per receiver, sharing fetches through the hub
+            coordinators = [
+                PreHdoCoordinator(hub.hass, hub, command_id)
+                for command_id in make_command_ids(receivers)
+                for _ in range(2)
+            ]
+
+            async def _refresh(coordinator: PreHdoCoordinator) -> None:
+                started = time.perf_counter()
+                await coordinator.async_refresh()
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(_refresh(c) for c in coordinators))
+            wall = time.perf_counter() - started
+            for coordinator in coordinators:
+                await coordinator.async_shutdown()
+
+        assert all(c.last_update_success for c in coordinators)
+        assert all(c.data.current_tariff is not None for c in coordinators)
+        assert fake_pre.requests == receivers * PREFETCH_DAYS
+        _report(
+            f"coordinators {len(coordinators)} for {receivers} receivers",
+            wall,
+            fake_pre.requests,
+            latencies,
+        )
+
+    async def test_outage_trips_circuit_breaker(
+        self, fake_pre, make_command_ids
+    ) -> None:
+        fake_pre.config.error_rate = 1.0
+        receivers = RECEIVER_COUNTS[-1]
+
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session, url=fake_pre.url)
+            started = time.perf_counter()
+            batches = await asyncio.gather(
+                *(
+                    client.async_get_hdo_periods_batch(command_id, _prefetch_days())
+                    for command_id in make_command_ids(receivers)
+                )
+            )
+            wall = time.perf_counter() - started
+
+        assert all(len(batch.errors) == PREFETCH_DAYS for batch in batches)
+        # Only the requests in flight when the circuit opened reached the server
+        assert fake_pre.requests <= FAILURE_THRESHOLD + MAX_CONCURRENT_REQUESTS
+        print(  # noqa: T201
+            f"\noutage {receivers} receivers: {fake_pre.requests} of "
+            f"{receivers * PREFETCH_DAYS} requests reached the server, "
+            f"{wall:.2f} s, errors {dict(client.metrics.errors)}"
+        )
+
+    async def test_partial_errors(self, fake_pre, make_command_ids) -> None:
+        fake_pre.config.error_rate = 0.05
+        fake_pre.config.latency = LATENCY
+        receivers = RECEIVER_COUNTS[-1]
+
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session, url=fake_pre.url)
+            batches = await asyncio.gather(
+                *(
+                    client.async_get_hdo_periods_batch(command_id, _prefetch_days())
+                    for command_id in make_command_ids(receivers)
+                )
+            )
+
+        fetched = sum(len(batch.periods) for batch in batches)
+        failed = sum(len(batch.errors) for batch in batches)
+        assert fetched + failed == receivers * PREFETCH_DAYS
+        print(  # noqa: T201
+            f"\n5% errors {receivers} receivers: {fetched} days fetched, "
+            f"{failed} failed, {fake_pre.errors} server errors, "
+            f"errors {dict(client.metrics.errors)}"
+        )
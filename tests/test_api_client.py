@@ -1,10 +1,20 @@
 """Tests for PRE Distribuce API client."""
 
+from datetime import date
+
 import pytest
 from aiohttp import ClientSession
 from aioresponses import aioresponses
 
-from custom_components.pre_hdo.api_client import PreHdoApiClient, PreHdoApiError
+from custom_components.pre_hdo.api_client import (
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    FAILURE_THRESHOLD,
+    CircuitBreaker,
+    PreHdoApiClient,
+    PreHdoApiError,
+    backoff_delay,
+)
 from custom_components.pre_hdo.const import HDO_ONE_DAY_URL
 
 
@@ -66,3 +76,116 @@ class TestPreHdoApiClient:
                 mock.post(HDO_ONE_DAY_URL, payload={"html": ""})
                 result = await client.async_validate_command_id("999")
                 assert result is False
+
+    @pytest.mark.asyncio
+    async def test_batch_fetch_returns_all_days(self, sample_hdo_json) -> None:
+        days = [date(2026, 2, 13), date(2026, 2, 14), date(2026, 2, 15)]
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session=session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+                batch = await client.async_get_hdo_periods_batch("492", days)
+                assert list(batch.periods) == days
+                assert all(len(p) == 5 for p in batch.periods.values())
+                assert batch.errors == {}
+
+    @pytest.mark.asyncio
+    async def test_batch_fetch_isolates_failing_day(self, sample_hdo_json) -> None:
+        days = [date(2026, 2, 13), date(2026, 2, 14), date(2026, 2, 15)]
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session=session, max_concurrency=1)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json)
+                mock.post(HDO_ONE_DAY_URL, status=500)
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json)
+                batch = await client.async_get_hdo_periods_batch("492", days)
+                assert set(batch.periods) == {days[0], days[2]}
+                assert isinstance(batch.errors[days[1]], PreHdoApiError)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_payload_is_not_reparsed(self, sample_hdo_json) -> None:
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session=session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+                digest, first = await client.async_get_hdo_day("492", "13.02.2026")
+                again = await client.async_get_hdo_day("492", "13.02.2026", digest)
+                other = await client.async_get_hdo_day("492", "14.02.2026", b"old")
+        assert again == (digest, None)
+        assert other == (digest, first)
+
+        metrics = client.metrics
+        assert metrics.requests == 3
+        assert metrics.payload_cache_hits == 1
+        assert metrics.payload_cache_misses == 2
+        assert metrics.parse_ms.count == 2
+        assert metrics.bytes_received > 0
+
+    @pytest.mark.asyncio
+    async def test_batch_skips_known_digests(self, sample_hdo_json) -> None:
+        days = [date(2026, 2, 13), date(2026, 2, 14)]
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session=session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+                first = await client.async_get_hdo_periods_batch("492", days)
+                second = await client.async_get_hdo_periods_batch(
+                    "492", days, {days[0]: first.digests[days[0]]}
+                )
+        assert set(first.periods) == set(days)
+        assert set(second.digests) == set(days)
+        assert set(second.periods) == {days[1]}
+
+    @pytest.mark.asyncio
+    async def test_changed_payload_is_parsed(self, sample_hdo_json) -> None:
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session=session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json)
+                mock.post(HDO_ONE_DAY_URL, payload={"html": ""})
+                first = await client.async_get_hdo_periods("492", "13.02.2026")
+                second = await client.async_get_hdo_periods("492", "13.02.2026")
+        assert len(first) == 5
+        assert second == []
+
+
+class TestCircuitBreaker:
+    def test_backoff_delay_grows_with_jitter(self) -> None:
+        assert BACKOFF_BASE / 2 <= backoff_delay(0) <= BACKOFF_BASE
+        assert BACKOFF_BASE <= backoff_delay(1) <= 2 * BACKOFF_BASE
+        assert BACKOFF_MAX / 2 <= backoff_delay(100) <= BACKOFF_MAX
+
+    def test_opens_at_threshold(self) -> None:
+        breaker = CircuitBreaker()
+        for _ in range(FAILURE_THRESHOLD - 1):
+            breaker.record_failure()
+        assert not breaker.is_open
+        breaker.record_failure()
+        assert breaker.is_open
+        assert breaker.retry_in > 0
+
+    def test_success_closes(self) -> None:
+        breaker = CircuitBreaker()
+        for _ in range(FAILURE_THRESHOLD):
+            breaker.record_failure()
+        breaker.record_success()
+        assert not breaker.is_open
+        assert breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self) -> None:
+        async with ClientSession() as session:
+            client = PreHdoApiClient(session=session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, status=500, repeat=True)
+                for _ in range(FAILURE_THRESHOLD):
+                    with pytest.raises(PreHdoApiError):
+                        await client.async_get_hdo_periods("492")
+                (calls,) = mock.requests.values()
+                assert len(calls) == FAILURE_THRESHOLD
+
+                # No request is made while the circuit is open
+                with pytest.raises(PreHdoApiError, match="not retrying"):
+                    await client.async_get_hdo_periods("492")
+                assert len(calls) == FAILURE_THRESHOLD
+        assert client.metrics.errors == {"http": FAILURE_THRESHOLD, "circuit_open": 1}
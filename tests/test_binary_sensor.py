@@ -1,9 +1,11 @@
 """Tests for PRE Distribuce binary sensor."""
 
-from datetime import time
+from dataclasses import replace
+from datetime import date, time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from custom_components.pre_hdo.coordinator import HdoData
-from custom_components.pre_hdo.parser import HdoPeriod
+from custom_components.pre_hdo.parser import HdoPeriod, HdoSchedule
 
 SAMPLE_PERIODS = [
     HdoPeriod(tariff="VT", start=time(0, 0), end=time(1, 0)),
@@ -12,6 +14,7 @@ SAMPLE_PERIODS = [
     HdoPeriod(tariff="NT", start=time(13, 0), end=time(16, 0)),
     HdoPeriod(tariff="VT", start=time(16, 0), end=time(0, 0)),
 ]
+SAMPLE_SCHEDULE = HdoSchedule.from_periods(SAMPLE_PERIODS)
 
 
 class TestCanApplianceRun:
@@ -19,10 +22,10 @@ class TestCanApplianceRun:
 
     def test_low_tariff_enough_time(self) -> None:
         """Appliance needs 30 min, 180 min of NT remain."""
-        from custom_components.pre_hdo.binary_sensor import can_appliance_run
+        from custom_components.pre_hdo.coordinator import can_appliance_run
 
         data = HdoData(
-            periods=SAMPLE_PERIODS,
+            schedule=SAMPLE_SCHEDULE,
             current_tariff="NT",
             is_low_tariff=True,
             minutes_to_next_change=180,
@@ -33,10 +36,10 @@ class TestCanApplianceRun:
 
     def test_low_tariff_not_enough_time(self) -> None:
         """Appliance needs 200 min, only 120 min of NT remain."""
-        from custom_components.pre_hdo.binary_sensor import can_appliance_run
+        from custom_components.pre_hdo.coordinator import can_appliance_run
 
         data = HdoData(
-            periods=SAMPLE_PERIODS,
+            schedule=SAMPLE_SCHEDULE,
             current_tariff="NT",
             is_low_tariff=True,
             minutes_to_next_change=120,
@@ -45,12 +48,45 @@ class TestCanApplianceRun:
         )
         assert can_appliance_run(data, 200) is False
 
+    def test_exact_fit(self) -> None:
+        """A run ending exactly when high tariff starts fits, as in find_window."""
+        from custom_components.pre_hdo.coordinator import (
+            can_appliance_run,
+            process_periods,
+        )
+
+        data = process_periods(SAMPLE_PERIODS, time(14, 0))
+        assert data.minutes_to_high_tariff == 120
+        assert can_appliance_run(data, 120) is True
+        assert can_appliance_run(data, 121) is False
+        assert SAMPLE_SCHEDULE.find_low_window(14 * 60, 120) == 14 * 60
+        assert SAMPLE_SCHEDULE.find_low_window(14 * 60, 121) is None
+
+    def test_exact_fit_past_start_of_minute(self) -> None:
+        """Seconds into the minute, less than the whole window remains."""
+        from custom_components.pre_hdo.coordinator import (
+            process_periods,
+            timeline_datetime,
+            timeline_minute,
+        )
+
+        data = process_periods(
+            SAMPLE_PERIODS, time(14, 0, 30), run_minutes={"Exact": 120, "Less": 119}
+        )
+        assert data.appliances == {"Exact": False, "Less": True}
+        # find_window starts at the next full minute
+        today = date(2024, 1, 15)
+        now = timeline_datetime(today, 14 * 60).replace(second=30)
+        start = timeline_minute(today, now, round_up=True)
+        assert SAMPLE_SCHEDULE.find_low_window(start, 120) is None
+        assert SAMPLE_SCHEDULE.find_low_window(start, 119) == 14 * 60 + 1
+
     def test_high_tariff_cannot_run(self) -> None:
         """During high tariff, appliance cannot run."""
-        from custom_components.pre_hdo.binary_sensor import can_appliance_run
+        from custom_components.pre_hdo.coordinator import can_appliance_run
 
         data = HdoData(
-            periods=SAMPLE_PERIODS,
+            schedule=SAMPLE_SCHEDULE,
             current_tariff="VT",
             is_low_tariff=False,
             minutes_to_next_change=60,
@@ -61,7 +97,128 @@ class TestCanApplianceRun:
 
     def test_no_data(self) -> None:
         """No data available."""
-        from custom_components.pre_hdo.binary_sensor import can_appliance_run
+        from custom_components.pre_hdo.coordinator import can_appliance_run
 
         data = HdoData()
         assert can_appliance_run(data, 30) is False
+
+
+class TestLowTariffAttributes:
+    """Test the cached schedule attributes of the low tariff sensor."""
+
+    def _make_sensor(self, data: HdoData):
+        from custom_components.pre_hdo.binary_sensor import HdoTariffBinarySensor
+
+        coordinator = MagicMock()
+        coordinator.data = data
+        return HdoTariffBinarySensor(coordinator, "492")
+
+    def test_periods_today_serialised(self) -> None:
+        sensor = self._make_sensor(HdoData(schedule=SAMPLE_SCHEDULE))
+        attrs = sensor.extra_state_attributes
+        assert attrs["periods_today"][1] == {
+            "tariff": "NT",
+            "start": "01:00",
+            "end": "06:00",
+        }
+
+    def test_periods_today_built_once_per_schedule(self) -> None:
+        sensor = self._make_sensor(HdoData(schedule=SAMPLE_SCHEDULE))
+        first = sensor.extra_state_attributes["periods_today"]
+        sensor.coordinator.data = HdoData(
+            schedule=SAMPLE_SCHEDULE, minutes_to_next_change=5
+        )
+        assert sensor.extra_state_attributes["periods_today"] is first
+        sensor.coordinator.data = HdoData(
+            schedule=HdoSchedule.from_periods(SAMPLE_PERIODS[:2])
+        )
+        assert len(sensor.extra_state_attributes["periods_today"]) == 2
+
+    def test_minute_tick_is_not_written(self) -> None:
+        data = HdoData(
+            schedule=SAMPLE_SCHEDULE,
+            current_tariff="NT",
+            is_low_tariff=True,
+            minutes_to_next_change=180,
+        )
+        sensor = self._make_sensor(data)
+        sensor.coordinator.last_update_success = True
+        sensor.async_write_ha_state = MagicMock()
+        sensor._handle_coordinator_update()
+        sensor.coordinator.data = replace(data, minutes_to_next_change=179)
+        sensor._handle_coordinator_update()
+        assert sensor.async_write_ha_state.call_count == 1
+        sensor.coordinator.data = replace(
+            data, current_tariff="VT", is_low_tariff=False
+        )
+        sensor._handle_coordinator_update()
+        assert sensor.async_write_ha_state.call_count == 2
+
+
+class TestApplianceBinarySensor:
+    """Test the appliance sensors reading the coordinator's batch result."""
+
+    def _make_sensor(self, data: HdoData | None):
+        from custom_components.pre_hdo.binary_sensor import HdoApplianceBinarySensor
+
+        coordinator = MagicMock()
+        coordinator.data = data
+        return HdoApplianceBinarySensor(coordinator, "492", "Washer", 120)
+
+    def test_reads_batch_result(self) -> None:
+        sensor = self._make_sensor(HdoData(appliances={"Washer": True}))
+        assert sensor.is_on is True
+        sensor.coordinator.data = HdoData(appliances={"Washer": False})
+        assert sensor.is_on is False
+
+    def test_no_data(self) -> None:
+        assert self._make_sensor(None).is_on is None
+
+    async def test_restored_until_data(self) -> None:
+        sensor = self._make_sensor(None)
+        sensor.async_get_last_state = AsyncMock(return_value=MagicMock(state="on"))
+        await sensor.async_added_to_hass()
+        assert sensor.is_on is True
+        sensor.coordinator.data = HdoData(appliances={"Washer": False})
+        assert sensor.is_on is False
+
+    async def test_unavailable_state_not_restored(self) -> None:
+        sensor = self._make_sensor(None)
+        sensor.async_get_last_state = AsyncMock(
+            return_value=MagicMock(state="unavailable")
+        )
+        await sensor.async_added_to_hass()
+        assert sensor.is_on is None
+
+    def test_unique_id_from_name(self) -> None:
+        sensor = self._make_sensor(HdoData())
+        assert sensor._attr_unique_id == "pre-hdo_492_appliance_washer"
+        assert sensor._attr_extra_state_attributes == {"minutes_needed": 120}
+
+
+class TestStaleAppliances:
+    """Registry entries of removed appliances are removed on setup."""
+
+    async def test_removed_appliance_entity_removed(self) -> None:
+        from custom_components.pre_hdo.binary_sensor import async_setup_entry
+
+        coordinator = MagicMock()
+        coordinator.run_minutes = {"Washer": 120}
+        entry = MagicMock()
+        entry.entry_id = "entry"
+        entry.runtime_data.coordinators = {"492": coordinator}
+        registered = [
+            MagicMock(entity_id=f"binary_sensor.{unique_id}", unique_id=unique_id)
+            for unique_id in (
+                "pre-hdo_492_low_tariff",
+                "pre-hdo_492_appliance_washer",
+                "pre-hdo_492_appliance_dryer",
+            )
+        ]
+        with patch("custom_components.pre_hdo.binary_sensor.er") as er:
+            er.async_entries_for_config_entry.return_value = registered
+            await async_setup_entry(MagicMock(), entry, MagicMock())
+
+        er.async_get.return_value.async_remove.assert_called_once_with(
+            "binary_sensor.pre-hdo_492_appliance_dryer"
+        )
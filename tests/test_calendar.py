@@ -0,0 +1,46 @@
+"""Tests for the PRE Distribuce HDO calendar."""
+
+from datetime import date, time
+
+from custom_components.pre_hdo.calendar import timeline_events
+from custom_components.pre_hdo.parser import HdoPeriod, HdoSchedule, HdoTimeline
+
+SAMPLE_PERIODS = [
+    HdoPeriod(tariff="VT", start=time(0, 0), end=time(1, 0)),
+    HdoPeriod(tariff="NT", start=time(1, 0), end=time(6, 0)),
+    HdoPeriod(tariff="VT", start=time(6, 0), end=time(13, 0)),
+    HdoPeriod(tariff="NT", start=time(13, 0), end=time(16, 0)),
+    HdoPeriod(tariff="VT", start=time(16, 0), end=time(0, 0)),
+]
+
+TODAY = date(2024, 1, 15)
+
+
+def _timeline(days: int) -> HdoTimeline:
+    return HdoTimeline.stitch([HdoSchedule.from_periods(SAMPLE_PERIODS)] * days)
+
+
+class TestTimelineEvents:
+    def test_low_tariff_events_in_range(self) -> None:
+        events = timeline_events(_timeline(3), TODAY, 0, 1440, "NT")
+        assert [(e.start.time(), e.end.time()) for e in events] == [
+            (time(1, 0), time(6, 0)),
+            (time(13, 0), time(16, 0)),
+        ]
+        assert {e.summary for e in events} == {"NT"}
+
+    def test_high_tariff_merged_across_midnight(self) -> None:
+        events = timeline_events(_timeline(2), TODAY, 20 * 60, 1440 + 60, "VT")
+        assert len(events) == 1
+        assert (events[0].start.date(), events[0].start.time()) == (TODAY, time(16))
+        assert (events[0].end.date(), events[0].end.time()) == (
+            date(2024, 1, 16),
+            time(1, 0),
+        )
+
+    def test_range_partially_overlapping_event(self) -> None:
+        events = timeline_events(_timeline(1), TODAY, 5 * 60, 5 * 60 + 1, "NT")
+        assert [e.start.time() for e in events] == [time(1, 0)]
+
+    def test_range_beyond_cached_days(self) -> None:
+        assert timeline_events(_timeline(2), TODAY, 3 * 1440, 4 * 1440, "NT") == []
@@ -1,6 +1,12 @@
 """Tests for PRE Distribuce config flow."""
 
+from custom_components.pre_hdo.config_flow import (
+    appliance_name_error,
+    parse_command_ids,
+)
 from custom_components.pre_hdo.const import (
+    CONF_PERIOD_MINUTES,
+    CONF_PERIOD_NAME,
     CONF_RECEIVER_COMMAND_ID,
     DOMAIN,
 )
@@ -14,3 +20,36 @@ class TestConfigFlowUnit:
 
     def test_config_keys(self) -> None:
         assert CONF_RECEIVER_COMMAND_ID == "receiver_command_id"
+
+
+class TestParseCommandIds:
+    def test_single(self) -> None:
+        assert parse_command_ids(" 492 ") == ["492"]
+
+    def test_several_separators(self) -> None:
+        assert parse_command_ids("492, 510;511 600") == ["492", "510", "511", "600"]
+
+    def test_duplicates_dropped_in_order(self) -> None:
+        assert parse_command_ids("510,492,510") == ["510", "492"]
+
+    def test_empty(self) -> None:
+        assert parse_command_ids(" , ") == []
+
+
+APPLIANCES = [
+    {CONF_PERIOD_NAME: "Washer", CONF_PERIOD_MINUTES: 120},
+    {CONF_PERIOD_NAME: "Boiler 1", CONF_PERIOD_MINUTES: 60},
+]
+
+
+class TestApplianceNameError:
+    def test_new_name(self) -> None:
+        assert appliance_name_error("Dishwasher", APPLIANCES) is None
+
+    def test_same_slug_exists(self) -> None:
+        for name in ("Washer", "washer", "boiler-1", "Boiler_1"):
+            assert appliance_name_error(name, APPLIANCES) == "appliance_exists"
+
+    def test_name_without_slug(self) -> None:
+        assert appliance_name_error("", []) == "invalid_appliance_name"
+        assert appliance_name_error("!!!", []) == "invalid_appliance_name"
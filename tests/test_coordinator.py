@@ -1,9 +1,20 @@
 """Tests for PRE Distribuce DataUpdateCoordinator."""
 
-from datetime import time
+from datetime import date, time, timedelta
+from unittest.mock import AsyncMock, MagicMock
 
-from custom_components.pre_hdo.coordinator import process_periods
-from custom_components.pre_hdo.parser import HdoPeriod
+from homeassistant.util import dt as dt_util
+
+from custom_components.pre_hdo.api_client import PreHdoApiError
+from custom_components.pre_hdo.const import EVENT_SCHEDULE_CHANGED, PREFETCH_DAYS
+from custom_components.pre_hdo.coordinator import (
+    PreHdoReceivers,
+    process_periods,
+    timeline_datetime,
+    timeline_minute,
+)
+from custom_components.pre_hdo.hub import HdoFetchResult
+from custom_components.pre_hdo.parser import HdoPeriod, HdoSchedule, HdoTimeline
 
 SAMPLE_PERIODS = [
     HdoPeriod(tariff="VT", start=time(0, 0), end=time(1, 0)),
@@ -13,6 +24,11 @@ SAMPLE_PERIODS = [
     HdoPeriod(tariff="VT", start=time(16, 0), end=time(0, 0)),
 ]
 
+NT_AFTER_MIDNIGHT = [
+    HdoPeriod(tariff="NT", start=time(0, 0), end=time(2, 0)),
+    HdoPeriod(tariff="VT", start=time(2, 0), end=time(0, 0)),
+]
+
 
 class TestProcessPeriods:
     def test_during_low_tariff(self) -> None:
@@ -55,3 +71,231 @@ class TestProcessPeriods:
         assert data.current_tariff == "VT"
         assert data.minutes_to_low_tariff == 180
         assert data.minutes_to_high_tariff == 0
+
+
+class TestProcessPeriodsAcrossMidnight:
+    """Minute values computed against a timeline continuing into tomorrow."""
+
+    def test_evening_minutes_to_low_sees_tomorrow(self) -> None:
+        timeline = HdoTimeline.stitch(
+            [
+                HdoSchedule.from_periods(SAMPLE_PERIODS),
+                HdoSchedule.from_periods(SAMPLE_PERIODS),
+            ]
+        )
+        data = process_periods(SAMPLE_PERIODS, time(20, 0), timeline)
+        # VT until 01:00 tomorrow, merged across midnight
+        assert data.minutes_to_low_tariff == 300
+        assert data.minutes_to_next_change == 300
+
+    def test_low_tariff_continuing_past_midnight(self) -> None:
+        today = [
+            HdoPeriod(tariff="VT", start=time(0, 0), end=time(22, 0)),
+            HdoPeriod(tariff="NT", start=time(22, 0), end=time(0, 0)),
+        ]
+        timeline = HdoTimeline.stitch(
+            [
+                HdoSchedule.from_periods(today),
+                HdoSchedule.from_periods(NT_AFTER_MIDNIGHT),
+            ]
+        )
+        data = process_periods(today, time(23, 0), timeline)
+        assert data.is_low_tariff is True
+        assert data.minutes_to_high_tariff == 180
+
+    def test_without_timeline_stops_at_midnight(self) -> None:
+        data = process_periods(SAMPLE_PERIODS, time(20, 0))
+        assert data.minutes_to_low_tariff == 240
+
+
+class TestTimelineDatetime:
+    def test_minute_of_today(self) -> None:
+        when = timeline_datetime(date(2024, 1, 15), 13 * 60 + 30)
+        assert (when.date(), when.time()) == (date(2024, 1, 15), time(13, 30))
+        assert when.tzinfo is not None
+
+    def test_minute_of_following_day(self) -> None:
+        when = timeline_datetime(date(2024, 1, 31), 1440 + 60)
+        assert (when.date(), when.time()) == (date(2024, 2, 1), time(1, 0))
+
+
+class TestTimelineMinute:
+    def test_round_trip(self) -> None:
+        today = date(2024, 1, 31)
+        when = timeline_datetime(today, 1440 + 90)
+        assert timeline_minute(today, when) == 1440 + 90
+
+    def test_seconds_round_down_or_up(self) -> None:
+        today = date(2024, 1, 15)
+        when = timeline_datetime(today, 600).replace(second=30)
+        assert timeline_minute(today, when) == 600
+        assert timeline_minute(today, when, round_up=True) == 601
+
+    def test_before_today(self) -> None:
+        today = date(2024, 1, 15)
+        assert timeline_minute(today, timeline_datetime(today, -60)) == -60
+
+
+class TestApplianceEvaluation:
+    """All configured appliances are evaluated with the minute values."""
+
+    def test_appliances_evaluated_in_one_pass(self) -> None:
+        run_minutes = {"Washer": 120, "Dishwasher": 200}
+        data = process_periods(SAMPLE_PERIODS, time(2, 0), run_minutes=run_minutes)
+        # 240 minutes of NT left
+        assert data.appliances == {"Washer": True, "Dishwasher": True}
+
+        data = process_periods(SAMPLE_PERIODS, time(13, 30), run_minutes=run_minutes)
+        assert data.appliances == {"Washer": True, "Dishwasher": False}
+
+    def test_appliances_off_in_high_tariff(self) -> None:
+        data = process_periods(SAMPLE_PERIODS, time(10, 0), run_minutes={"Washer": 1})
+        assert data.appliances == {"Washer": False}
+
+    def test_appliances_without_schedule(self) -> None:
+        data = process_periods([], time(10, 0), run_minutes={"Washer": 1})
+        assert data.appliances == {"Washer": False}
+
+
+class TestPreHdoReceivers:
+    """Receivers of one entry set up and refreshed together."""
+
+    def _make_receivers(self, cached: dict) -> PreHdoReceivers:
+        hub = MagicMock()
+        hub.store.get_schedule.side_effect = lambda command_id, _since: cached.get(
+            command_id, {}
+        )
+        hub.store.get_last_success.return_value = None
+        hub.client.breaker.retry_in = 0.0
+        hub.async_fetch = AsyncMock(
+            return_value=HdoFetchResult(
+                errors={dt_util.now().date(): PreHdoApiError("down")}
+            )
+        )
+        return PreHdoReceivers(MagicMock(), hub, ["492", "510"])
+
+    def test_setup_does_not_fetch(self) -> None:
+        today = dt_util.now().date()
+        receivers = self._make_receivers({"492": {today: SAMPLE_PERIODS}})
+        entry = MagicMock()
+        receivers.async_setup(entry)
+
+        entry.async_create_background_task.assert_called_once()
+        entry.async_create_background_task.call_args.args[1].close()
+        receivers.coordinators["492"].hub.async_fetch.assert_not_called()
+        assert receivers.coordinators["492"].data is not None
+        assert receivers.coordinators["510"].data is None
+
+    def test_restored_data_has_transitions(self) -> None:
+        today = dt_util.now().date()
+        receivers = self._make_receivers({"492": {today: SAMPLE_PERIODS}})
+        entry = MagicMock()
+        receivers.async_setup(entry)
+        entry.async_create_background_task.call_args.args[1].close()
+
+        data = receivers.coordinators["492"].data
+        assert data.tariff_ends > dt_util.now()
+        # Only today is cached, so no transition lies beyond its midnight
+        assert data.tariff_ends.date() == today or data.tariff_ends.time() == time(0)
+
+    async def test_first_refresh_in_background(self) -> None:
+        receivers = self._make_receivers({})
+        entry = MagicMock()
+        receivers.async_setup(entry)
+
+        await entry.async_create_background_task.call_args.args[1]
+        hub = receivers.coordinators["492"].hub
+        assert {call.args[0] for call in hub.async_fetch.call_args_list} == {
+            "492",
+            "510",
+        }
+        # Failures leave the entities unavailable instead of failing setup
+        assert not any(c.last_update_success for c in receivers.coordinators.values())
+
+
+class TestRetry:
+    """Failed days are retried on their own."""
+
+    async def test_retry_fetches_only_failed_day(self) -> None:
+        today = dt_util.now().date()
+        far_day = today + timedelta(days=PREFETCH_DAYS - 1)
+        receivers = TestPreHdoReceivers()._make_receivers({})
+        coordinator = receivers.coordinators["492"]
+        coordinator.days[today] = HdoSchedule.from_periods(SAMPLE_PERIODS)
+        hub = coordinator.hub
+        hub.async_fetch.return_value = HdoFetchResult(
+            errors={far_day: PreHdoApiError("not published")}
+        )
+
+        await coordinator.async_refresh()
+        assert len(hub.async_fetch.call_args.args[1]) == PREFETCH_DAYS
+        await coordinator._async_handle_retry(dt_util.now())
+        assert hub.async_fetch.call_args.args[1] == [far_day]
+
+        # Once it succeeds, the regular refresh fetches the whole window again
+        hub.async_fetch.return_value = HdoFetchResult()
+        await coordinator._async_handle_retry(dt_util.now())
+        await coordinator.async_refresh()
+        assert len(hub.async_fetch.call_args.args[1]) == PREFETCH_DAYS
+
+
+class TestScheduleChanged:
+    """Fetched schedules are diffed against the cached day."""
+
+    def _make_coordinator(self):
+        receivers = TestPreHdoReceivers()._make_receivers({})
+        return receivers.coordinators["492"]
+
+    def test_event_with_changed_blocks(self) -> None:
+        coordinator = self._make_coordinator()
+        day = date(2024, 1, 15)
+        coordinator._async_schedule_fetched(
+            day, HdoSchedule.from_periods(SAMPLE_PERIODS)
+        )
+        coordinator.hass.bus.async_fire.assert_not_called()
+
+        periods = [
+            *SAMPLE_PERIODS[:3],
+            HdoPeriod(tariff="NT", start=time(13, 0), end=time(15, 0)),
+            HdoPeriod(tariff="VT", start=time(15, 0), end=time(0, 0)),
+        ]
+        coordinator._async_schedule_fetched(day, HdoSchedule.from_periods(periods))
+        coordinator.hass.bus.async_fire.assert_called_once_with(
+            EVENT_SCHEDULE_CHANGED,
+            {
+                "command_id": "492",
+                "date": "2024-01-15",
+                "added": [],
+                "removed": [],
+                "shifted": [
+                    {
+                        "tariff": "NT",
+                        "start": "13:00",
+                        "end": "15:00",
+                        "previous_start": "13:00",
+                        "previous_end": "16:00",
+                    },
+                    {
+                        "tariff": "VT",
+                        "start": "15:00",
+                        "end": "00:00",
+                        "previous_start": "16:00",
+                        "previous_end": "00:00",
+                    },
+                ],
+            },
+        )
+
+    def test_no_event_for_resplit_schedule(self) -> None:
+        coordinator = self._make_coordinator()
+        day = date(2024, 1, 15)
+        coordinator._async_schedule_fetched(
+            day, HdoSchedule.from_periods(SAMPLE_PERIODS)
+        )
+        periods = [
+            HdoPeriod(tariff="VT", start=time(0, 0), end=time(0, 30)),
+            HdoPeriod(tariff="VT", start=time(0, 30), end=time(1, 0)),
+            *SAMPLE_PERIODS[1:],
+        ]
+        coordinator._async_schedule_fetched(day, HdoSchedule.from_periods(periods))
+        coordinator.hass.bus.async_fire.assert_not_called()
@@ -0,0 +1,243 @@
+"""Tests for the PRE Distribuce single-flight fetch hub."""
+
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiohttp import ClientSession
+from aioresponses import aioresponses
+from homeassistant.util import dt as dt_util
+
+from custom_components.pre_hdo.api_client import PreHdoApiClient
+from custom_components.pre_hdo.const import HDO_ONE_DAY_URL
+from custom_components.pre_hdo.hub import PreHdoHub, async_close_hub, async_get_hub
+
+DAY = date(2026, 2, 13)
+
+
+def _make_hub(session: ClientSession) -> PreHdoHub:
+    loop = asyncio.get_running_loop()
+    hass = MagicMock()
+    hass.loop = loop
+    hass.async_create_background_task = lambda coro, _name: loop.create_task(coro)
+    return PreHdoHub(hass, PreHdoApiClient(session=session), MagicMock())
+
+
+class TestPreHdoHub:
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_one_request(self, sample_hdo_json) -> None:
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+                results = await asyncio.gather(
+                    hub.async_fetch("492", [DAY]),
+                    hub.async_fetch("492", [DAY]),
+                    hub.async_fetch("492", [DAY]),
+                )
+                assert sum(len(calls) for calls in mock.requests.values()) == 1
+            assert all(len(r.schedules[DAY].tariffs) == 5 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_result_fans_out_to_subscribers(self, sample_hdo_json) -> None:
+        received: list[tuple[str, date, int]] = []
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            hub.async_subscribe(
+                "492", lambda d, p: received.append(("a", d, len(p.periods)))
+            )
+            hub.async_subscribe(
+                "492", lambda d, p: received.append(("b", d, len(p.periods)))
+            )
+            unsub = hub.async_subscribe(
+                "999", lambda d, p: received.append(("c", d, len(p.periods)))
+            )
+            unsub()
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json)
+                await hub.async_fetch("492", [DAY])
+        assert received == [("a", DAY, 5), ("b", DAY, 5)]
+        hub.store.async_set_periods.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_not_cached(self, sample_hdo_json) -> None:
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, status=500)
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json)
+                first, second = await asyncio.gather(
+                    hub.async_fetch("492", [DAY]),
+                    hub.async_fetch("492", [DAY]),
+                )
+                assert DAY in first.errors
+                assert DAY in second.errors
+                retry = await hub.async_fetch("492", [DAY])
+                assert len(retry.schedules[DAY].tariffs) == 5
+
+    @pytest.mark.asyncio
+    async def test_empty_schedule_keeps_cached_one(self) -> None:
+        received = []
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            hub.store.has_periods.return_value = True
+            hub.async_subscribe("492", lambda d, _s: received.append(d))
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload={"html": ""})
+                result = await hub.async_fetch("492", [DAY])
+        assert DAY in result.errors
+        assert DAY not in result.schedules
+        assert received == []
+        hub.store.async_set_periods.assert_not_called()
+        assert hub.metrics.empty_schedules_rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_schedule_without_cached_one(self) -> None:
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            hub.store.has_periods.return_value = False
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload={"html": ""})
+                result = await hub.async_fetch("492", [DAY])
+        assert result.schedules[DAY].tariffs == ()
+
+    @pytest.mark.asyncio
+    async def test_unchanged_schedule_is_reused(self, sample_hdo_json) -> None:
+        received = []
+        today = dt_util.now().date()
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            hub.async_subscribe("492", lambda _d, s: received.append(s))
+            with (
+                aioresponses() as mock,
+                patch("custom_components.pre_hdo.hub.FETCH_CACHE_TTL", 0),
+            ):
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+                await hub.async_fetch("492", [today])
+                await hub.async_fetch("492", [today])
+        assert received[0] is received[1]
+        hub.store.async_set_periods.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_recent_fetch_served_from_memory(self, sample_hdo_json) -> None:
+        received = []
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            hub.async_subscribe("492", lambda d, _s: received.append(d))
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+                await hub.async_fetch("492", [DAY])
+                again = await hub.async_fetch("492", [DAY])
+                assert sum(len(calls) for calls in mock.requests.values()) == 1
+        assert len(again.schedules[DAY].tariffs) == 5
+        assert received == [DAY, DAY]
+        assert hub.metrics.fetch_cache_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_reload_served_from_memory(self, sample_hdo_json) -> None:
+        loop = asyncio.get_running_loop()
+        hass = MagicMock()
+        hass.loop = loop
+        hass.data = {}
+        hass.async_create_background_task = lambda coro, _name: loop.create_task(coro)
+        with (
+            aioresponses() as mock,
+            patch(
+                "custom_components.pre_hdo.hub.async_get_schedule_store",
+                AsyncMock(return_value=MagicMock()),
+            ),
+            patch("custom_components.pre_hdo.hub._create_session", ClientSession),
+        ):
+            mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+            hub = await async_get_hub(hass)
+            await hub.async_fetch("492", [DAY])
+            # The last entry unloads and sets up again, as on a reload
+            await async_close_hub(hass)
+            reloaded = await async_get_hub(hass)
+            result = await reloaded.async_fetch("492", [DAY])
+            await async_close_hub(hass)
+            assert sum(len(calls) for calls in mock.requests.values()) == 1
+        assert reloaded is not hub
+        assert reloaded.client.breaker is hub.client.breaker
+        assert len(result.schedules[DAY].tariffs) == 5
+
+    @pytest.mark.asyncio
+    async def test_validation_seeds_first_refresh(self, sample_hdo_json) -> None:
+        today = dt_util.now().date()
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json, repeat=True)
+                assert await hub.async_validate_command_ids(["492"]) == {"492": True}
+                assert await hub.async_validate_command_ids(["492"]) == {"492": True}
+                hub.store.async_set_periods.assert_not_called()
+                await hub.async_fetch("492", [today])
+                assert sum(len(calls) for calls in mock.requests.values()) == 1
+        assert hub.metrics.validation_cache_hits == 1
+        # Stored once an entry fetched it
+        hub.store.async_set_periods.assert_called_once()
+        hub.store.async_set_last_success.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_rejected_command_id_not_stored(self) -> None:
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            hub.store.has_periods.return_value = False
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, payload={"html": ""})
+                assert await hub.async_validate_command_ids(["999"]) == {"999": False}
+        hub.store.async_set_periods.assert_not_called()
+        hub.store.async_set_last_success.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_validation_not_cached(self, sample_hdo_json) -> None:
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+            with aioresponses() as mock:
+                mock.post(HDO_ONE_DAY_URL, status=500)
+                mock.post(HDO_ONE_DAY_URL, payload=sample_hdo_json)
+                assert await hub.async_validate_command_ids(["492"]) == {"492": False}
+                assert await hub.async_validate_command_ids(["492"]) == {"492": True}
+
+    @pytest.mark.asyncio
+    async def test_minute_listeners_share_one_timer(self) -> None:
+        async with ClientSession() as session:
+            hub = _make_hub(session)
+        ticks = []
+        with patch(
+            "custom_components.pre_hdo.hub.async_track_time_change"
+        ) as track_time_change:
+            unsub_a = hub.async_track_minute(lambda now: ticks.append(("a", now)))
+            unsub_b = hub.async_track_minute(lambda now: ticks.append(("b", now)))
+            assert track_time_change.call_count == 1
+
+            tick = track_time_change.call_args.args[1]
+            tick("12:00")
+            assert ticks == [("a", "12:00"), ("b", "12:00")]
+
+            unsub_a()
+            track_time_change.return_value.assert_not_called()
+            unsub_b()
+            track_time_change.return_value.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_fetches_and_closes_session(self) -> None:
+        session = ClientSession()
+        hub = _make_hub(session)
+        hub._session = session
+        started = asyncio.Event()
+
+        async def _hang(_command_id, _days, _known):
+            started.set()
+            await asyncio.Event().wait()
+
+        hub.client.async_get_hdo_periods_batch = _hang
+        fetch = asyncio.ensure_future(hub.async_fetch("492", [DAY]))
+        await started.wait()
+
+        await hub.async_close()
+        with pytest.raises(asyncio.CancelledError):
+            await fetch
+        assert session.closed
+        assert not hub._inflight
@@ -0,0 +1,29 @@
+"""Tests for PRE Distribuce HDO instrumentation."""
+
+from custom_components.pre_hdo.metrics import ClientMetrics, Histogram
+
+
+class TestHistogram:
+    def test_observe_buckets(self) -> None:
+        histogram = Histogram((10, 100))
+        for value in (5, 10, 50, 500):
+            histogram.observe(value)
+        result = histogram.as_dict()
+        assert result["buckets"] == {"<=10": 2, "<=100": 1, ">100": 1}
+        assert result["count"] == 4
+        assert result["mean"] == 141.25
+        assert result["max"] == 500
+
+    def test_empty(self) -> None:
+        result = Histogram((10,)).as_dict()
+        assert result["count"] == 0
+        assert result["mean"] is None
+
+
+class TestClientMetrics:
+    def test_as_dict(self) -> None:
+        metrics = ClientMetrics()
+        metrics.errors["timeout"] += 2
+        result = metrics.as_dict()
+        assert result["errors"] == {"timeout": 2}
+        assert result["fetch_ms"]["count"] == 0
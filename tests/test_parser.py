@@ -1,11 +1,19 @@
 """Tests for HDO HTML parser."""
 
+import json
+import sys
 from datetime import time
 
 from custom_components.pre_hdo.parser import (
+    HdoPeriod,
+    HdoSchedule,
+    HdoTimeline,
+    diff_schedules,
     get_current_tariff,
+    get_next_change,
     get_time_remaining,
     parse_hdo_periods,
+    scan_hdo_periods,
 )
 
 
@@ -38,6 +46,37 @@ class TestParseHdoPeriods:
     def test_malformed_html_returns_empty_list(self) -> None:
         assert parse_hdo_periods("<div>no data</div>") == []
 
+    def test_parses_raw_json_bytes(self, sample_hdo_html, sample_hdo_json) -> None:
+        body = json.dumps(sample_hdo_json).encode()
+        assert parse_hdo_periods(body) == parse_hdo_periods(sample_hdo_html)
+
+
+class TestScanHdoPeriods:
+    def test_no_issues_for_valid_html(self, sample_hdo_html) -> None:
+        result = scan_hdo_periods(sample_hdo_html)
+        assert len(result.periods) == 5
+        assert result.issues == []
+
+    def test_stray_tariff_element_keeps_other_periods(self, sample_hdo_html) -> None:
+        html = '<span class="hdont"></span>' + sample_hdo_html
+        result = scan_hdo_periods(html)
+        assert len(result.periods) == 5
+        assert len(result.issues) == 1
+        assert result.issues[0].offset == html.index("class")
+        assert "without time range" in result.issues[0].message
+
+    def test_stray_time_range_is_reported(self) -> None:
+        html = '<span title="01:00 - 02:00"></span>'
+        result = scan_hdo_periods(html)
+        assert result.periods == []
+        assert "without tariff" in result.issues[0].message
+
+    def test_invalid_time_is_reported(self) -> None:
+        html = '<span class="hdovt"></span><span title="25:00 - 26:00"></span>'
+        result = scan_hdo_periods(html)
+        assert result.periods == []
+        assert "invalid time range" in result.issues[0].message
+
 
 class TestGetCurrentTariff:
     def test_during_high_tariff_morning(self, sample_hdo_html) -> None:
@@ -90,3 +129,209 @@ class TestGetTimeRemaining:
 
     def test_empty_periods_returns_zero(self) -> None:
         assert get_time_remaining([], time(12, 0)) == 0
+
+
+class TestGetNextChange:
+    def test_next_change_during_low_tariff(self, sample_hdo_html) -> None:
+        """At 03:00, the next boundary is the end of NT at 06:00."""
+        periods = parse_hdo_periods(sample_hdo_html)
+        assert get_next_change(periods, time(3, 0)) == 6 * 60
+
+    def test_next_change_at_exact_boundary(self, sample_hdo_html) -> None:
+        """At 06:00 sharp, the 06:00 boundary has passed, next is 13:00."""
+        periods = parse_hdo_periods(sample_hdo_html)
+        assert get_next_change(periods, time(6, 0)) == 13 * 60
+
+    def test_next_change_ignores_seconds(self, sample_hdo_html) -> None:
+        periods = parse_hdo_periods(sample_hdo_html)
+        assert get_next_change(periods, time(12, 59, 30)) == 13 * 60
+
+    def test_next_change_last_period_is_midnight(self, sample_hdo_html) -> None:
+        periods = parse_hdo_periods(sample_hdo_html)
+        assert get_next_change(periods, time(20, 0)) == 24 * 60
+
+    def test_empty_periods_returns_midnight(self) -> None:
+        assert get_next_change([], time(12, 0)) == 24 * 60
+
+
+class TestHdoSchedule:
+    def test_midnight_end_is_end_of_day(self, sample_hdo_html) -> None:
+        schedule = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert schedule.starts.tolist() == [0, 60, 360, 780, 960]
+        assert schedule.ends.tolist() == [60, 360, 780, 960, 1440]
+
+    def test_index_at(self, sample_hdo_html) -> None:
+        schedule = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert schedule.index_at(0) == 0
+        assert schedule.index_at(359) == 1
+        assert schedule.index_at(360) == 2
+        assert schedule.index_at(1439) == 4
+
+    def test_minutes_to_low_skips_to_next_nt(self, sample_hdo_html) -> None:
+        schedule = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert schedule.minutes_to_low(10 * 60) == 180
+        assert schedule.minutes_to_low(3 * 60) == 0
+
+    def test_minutes_to_high(self, sample_hdo_html) -> None:
+        schedule = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert schedule.minutes_to_high(14 * 60) == 120
+        assert schedule.minutes_to_high(20 * 60) == 0
+
+    def test_unsorted_periods_are_sorted(self, sample_hdo_html) -> None:
+        periods = parse_hdo_periods(sample_hdo_html)
+        schedule = HdoSchedule.from_periods(list(reversed(periods)))
+        assert schedule.periods == periods
+
+    def test_compact_storage(self) -> None:
+        # Tariff codes built at runtime, as when loaded from the disk cache
+        tariff = json.loads('"NT"')
+        schedule = HdoSchedule.from_periods([HdoPeriod(tariff, time(1), time(6))])
+        assert schedule.tariffs[0] is sys.intern("NT")
+        assert schedule.starts.itemsize == 2
+        assert not hasattr(schedule, "__dict__")
+        # Periods are materialised on demand only
+        assert schedule.periods == [HdoPeriod("NT", time(1), time(6))]
+        assert schedule.periods is not schedule.periods
+
+    def test_helpers_accept_compiled_schedule(self, sample_hdo_html) -> None:
+        schedule = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert get_current_tariff(schedule, time(3, 0)) == "NT"
+        assert get_time_remaining(schedule, time(3, 0)) == 180
+        assert get_next_change(schedule, time(3, 0)) == 360
+
+
+class TestHdoTimeline:
+    def test_stitch_offsets_following_days(self, sample_hdo_html) -> None:
+        day = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        timeline = HdoTimeline.stitch([day, day])
+        assert timeline.starts[5] == 1440 + 60
+        assert timeline.ends[-1] == 2 * 1440
+
+    def test_stitch_merges_blocks_across_midnight(self, sample_hdo_html) -> None:
+        day = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        timeline = HdoTimeline.stitch([day, day])
+        # 16:00-00:00 VT and 00:00-01:00 VT become one block
+        assert timeline.index_at(20 * 60) == timeline.index_at(1440 + 30)
+        assert timeline.remaining(20 * 60) == 300
+        assert len(timeline.starts) == 9
+
+    def test_outside_timeline(self) -> None:
+        timeline = HdoTimeline.stitch([])
+        assert timeline.tariff_at(0) is None
+        assert timeline.remaining(0) == 0
+
+
+class TestFindLowWindow:
+    def test_low_minutes_before(self, sample_hdo_html) -> None:
+        timeline = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert timeline.low_minutes_before(60) == 0
+        assert timeline.low_minutes_before(3 * 60) == 120
+        assert timeline.low_minutes_before(14 * 60) == 360
+
+    def test_next_block_long_enough(self, sample_hdo_html) -> None:
+        timeline = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        # 13:00-16:00 NT
+        assert timeline.find_low_window(10 * 60, 120) == 13 * 60
+
+    def test_starts_now_during_low_tariff(self, sample_hdo_html) -> None:
+        timeline = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert timeline.find_low_window(2 * 60, 180) == 2 * 60
+        # Only 60 NT minutes left in the night block
+        assert timeline.find_low_window(5 * 60, 120) == 13 * 60
+
+    def test_does_not_fit_today(self, sample_hdo_html) -> None:
+        day = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert day.find_low_window(10 * 60, 200) is None
+        timeline = HdoTimeline.stitch([day, day])
+        # 01:00-06:00 NT tomorrow
+        assert timeline.find_low_window(10 * 60, 200) == 1440 + 60
+
+
+class TestBlocksBetween:
+    def test_overlapping_blocks(self, sample_hdo_html) -> None:
+        timeline = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        blocks = timeline.blocks_between(2 * 60, 14 * 60)
+        assert [timeline.starts[i] for i in blocks] == [60, 6 * 60, 13 * 60]
+
+    def test_touching_bounds_are_excluded(self, sample_hdo_html) -> None:
+        timeline = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        blocks = timeline.blocks_between(6 * 60, 13 * 60)
+        assert [timeline.starts[i] for i in blocks] == [6 * 60]
+
+    def test_range_outside_timeline(self, sample_hdo_html) -> None:
+        timeline = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert len(timeline.blocks_between(1440, 2 * 1440)) == 0
+
+
+class TestTransitions:
+    def test_next_start(self, sample_hdo_html) -> None:
+        timeline = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        # During VT 06:00-13:00
+        assert timeline.next_start(10 * 60, "NT") == 13 * 60
+        assert timeline.next_start(10 * 60, "VT") == 16 * 60
+        # The current NT block does not count
+        assert timeline.next_start(2 * 60, "NT") == 13 * 60
+        assert timeline.next_start(2 * 60, "VT") == 6 * 60
+
+    def test_next_start_beyond_timeline(self, sample_hdo_html) -> None:
+        day = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert day.next_start(14 * 60, "NT") is None
+        timeline = HdoTimeline.stitch([day, day])
+        assert timeline.next_start(14 * 60, "NT") == 1440 + 60
+
+    def test_block_end_across_midnight(self, sample_hdo_html) -> None:
+        day = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        assert day.block_end(20 * 60) == 1440
+        # 16:00-24:00 VT continues with 00:00-01:00 VT of the next day
+        assert HdoTimeline.stitch([day, day]).block_end(20 * 60) == 1440 + 60
+
+
+class TestDiffSchedules:
+    def test_same_blocks_split_differently(self, sample_hdo_html) -> None:
+        old = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        new = HdoSchedule.from_periods(
+            [
+                HdoPeriod("VT", time(0, 0), time(1, 0)),
+                HdoPeriod("NT", time(1, 0), time(3, 0)),
+                HdoPeriod("NT", time(3, 0), time(6, 0)),
+                *old.periods[2:],
+            ]
+        )
+        assert not diff_schedules(old, new)
+
+    def test_shifted_block(self, sample_hdo_html) -> None:
+        old = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        periods = old.periods
+        periods[2:4] = [
+            HdoPeriod("VT", time(6, 0), time(14, 0)),
+            HdoPeriod("NT", time(14, 0), time(16, 0)),
+        ]
+        diff = diff_schedules(old, HdoSchedule.from_periods(periods))
+        assert diff.added == diff.removed == []
+        assert diff.shifted == [
+            (
+                HdoPeriod("VT", time(6, 0), time(13, 0)),
+                HdoPeriod("VT", time(6, 0), time(14, 0)),
+            ),
+            (
+                HdoPeriod("NT", time(13, 0), time(16, 0)),
+                HdoPeriod("NT", time(14, 0), time(16, 0)),
+            ),
+        ]
+
+    def test_added_and_removed_blocks(self, sample_hdo_html) -> None:
+        old = HdoSchedule.from_periods(parse_hdo_periods(sample_hdo_html))
+        periods = old.periods
+        # The afternoon NT is dropped and a new one starts in the evening
+        periods[2:] = [
+            HdoPeriod("VT", time(6, 0), time(20, 0)),
+            HdoPeriod("NT", time(20, 0), time(22, 0)),
+            HdoPeriod("VT", time(22, 0), time(0, 0)),
+        ]
+        diff = diff_schedules(old, HdoSchedule.from_periods(periods))
+        assert diff.removed == [HdoPeriod("NT", time(13, 0), time(16, 0))]
+        assert diff.added == [HdoPeriod("NT", time(20, 0), time(22, 0))]
+        assert [new for _, new in diff.shifted] == [
+            HdoPeriod("VT", time(6, 0), time(20, 0)),
+            HdoPeriod("VT", time(22, 0), time(0, 0)),
+        ]
@@ -1,9 +1,10 @@
 """Tests for PRE Distribuce sensor entities."""
 
-from datetime import time
+from datetime import UTC, datetime, time
+from unittest.mock import AsyncMock, MagicMock
 
 from custom_components.pre_hdo.coordinator import HdoData
-from custom_components.pre_hdo.parser import HdoPeriod
+from custom_components.pre_hdo.parser import HdoPeriod, HdoSchedule
 
 SAMPLE_PERIODS = [
     HdoPeriod(tariff="VT", start=time(0, 0), end=time(1, 0)),
@@ -12,6 +13,7 @@ SAMPLE_PERIODS = [
     HdoPeriod(tariff="NT", start=time(13, 0), end=time(16, 0)),
     HdoPeriod(tariff="VT", start=time(16, 0), end=time(0, 0)),
 ]
+SAMPLE_SCHEDULE = HdoSchedule.from_periods(SAMPLE_PERIODS)
 
 
 class TestSensorValues:
@@ -19,7 +21,7 @@ class TestSensorValues:
 
     def test_minutes_to_low_tariff_during_high(self) -> None:
         data = HdoData(
-            periods=SAMPLE_PERIODS,
+            schedule=SAMPLE_SCHEDULE,
             current_tariff="VT",
             is_low_tariff=False,
             minutes_to_next_change=180,
@@ -30,7 +32,7 @@ class TestSensorValues:
 
     def test_minutes_to_low_tariff_during_low(self) -> None:
         data = HdoData(
-            periods=SAMPLE_PERIODS,
+            schedule=SAMPLE_SCHEDULE,
             current_tariff="NT",
             is_low_tariff=True,
             minutes_to_next_change=120,
@@ -41,7 +43,7 @@ class TestSensorValues:
 
     def test_minutes_to_high_tariff_during_low(self) -> None:
         data = HdoData(
-            periods=SAMPLE_PERIODS,
+            schedule=SAMPLE_SCHEDULE,
             current_tariff="NT",
             is_low_tariff=True,
             minutes_to_next_change=120,
@@ -55,3 +57,70 @@ class TestSensorValues:
         assert data.minutes_to_low_tariff == 0
         assert data.minutes_to_high_tariff == 0
         assert data.current_tariff is None
+
+
+class TestStateWrites:
+    """Test that entities only write state when their value changed."""
+
+    def _make_sensor(self, data: HdoData | None):
+        from custom_components.pre_hdo.sensor import HdoMinutesToLowTariffSensor
+
+        coordinator = MagicMock()
+        coordinator.data = data
+        coordinator.last_update_success = True
+        sensor = HdoMinutesToLowTariffSensor(coordinator, "492")
+        sensor.async_write_ha_state = MagicMock()
+        return sensor
+
+    def test_unchanged_value_is_not_written(self) -> None:
+        sensor = self._make_sensor(HdoData(minutes_to_low_tariff=180))
+        sensor._handle_coordinator_update()
+        sensor.coordinator.data = HdoData(
+            minutes_to_low_tariff=180, minutes_to_high_tariff=5
+        )
+        sensor._handle_coordinator_update()
+        assert sensor.async_write_ha_state.call_count == 1
+
+    def test_changed_value_is_written(self) -> None:
+        sensor = self._make_sensor(HdoData(minutes_to_low_tariff=180))
+        sensor._handle_coordinator_update()
+        sensor.coordinator.data = HdoData(minutes_to_low_tariff=179)
+        sensor._handle_coordinator_update()
+        assert sensor.async_write_ha_state.call_count == 2
+
+    def test_availability_change_is_written(self) -> None:
+        sensor = self._make_sensor(HdoData(minutes_to_low_tariff=180))
+        sensor._handle_coordinator_update()
+        sensor.coordinator.last_update_success = False
+        sensor._handle_coordinator_update()
+        assert sensor.async_write_ha_state.call_count == 2
+
+    async def test_restored_value_until_data(self) -> None:
+        sensor = self._make_sensor(None)
+        sensor.async_get_last_sensor_data = AsyncMock(
+            return_value=MagicMock(native_value=42)
+        )
+        await sensor.async_added_to_hass()
+        assert sensor.native_value == 42
+        sensor.coordinator.data = HdoData(minutes_to_low_tariff=30)
+        assert sensor.native_value == 30
+
+
+class TestTransitionSensors:
+    """The timestamp sensors only change at tariff transitions."""
+
+    def test_unchanged_between_transitions(self) -> None:
+        from custom_components.pre_hdo.sensor import HdoNextLowTariffSensor
+
+        next_low = datetime(2024, 1, 15, 13, 0, tzinfo=UTC)
+        coordinator = MagicMock()
+        coordinator.data = HdoData(minutes_to_low_tariff=180, next_low_tariff=next_low)
+        coordinator.last_update_success = True
+        sensor = HdoNextLowTariffSensor(coordinator, "492")
+        sensor.async_write_ha_state = MagicMock()
+
+        sensor._handle_coordinator_update()
+        coordinator.data = HdoData(minutes_to_low_tariff=179, next_low_tariff=next_low)
+        sensor._handle_coordinator_update()
+        assert sensor.native_value == next_low
+        assert sensor.async_write_ha_state.call_count == 1
@@ -0,0 +1,32 @@
+"""Tests for PRE Distribuce HDO services."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.pre_hdo.const import (
+    CONF_PERIOD_MINUTES,
+    CONF_PERIOD_NAME,
+    CONF_PERIODS,
+)
+from custom_components.pre_hdo.services import ATTR_APPLIANCE, _get_run_minutes
+
+
+class TestGetRunMinutes:
+    def _call(self, appliance: str) -> tuple[MagicMock, MagicMock]:
+        entry = MagicMock()
+        entry.options = {
+            CONF_PERIODS: [{CONF_PERIOD_NAME: "Boiler 1", CONF_PERIOD_MINUTES: 60}]
+        }
+        call = MagicMock()
+        call.data = {ATTR_APPLIANCE: appliance}
+        return entry, call
+
+    def test_appliance_matched_by_slug(self) -> None:
+        for name in ("Boiler 1", "boiler-1", " BOILER_1 "):
+            assert _get_run_minutes(*self._call(name)) == 60
+
+    def test_unknown_appliance(self) -> None:
+        with pytest.raises(ServiceValidationError):
+            _get_run_minutes(*self._call("Dryer"))
@@ -0,0 +1,94 @@
+"""Tests for the PRE Distribuce HDO long-term statistics."""
+
+from datetime import date, time, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.pre_hdo.parser import HdoPeriod, HdoSchedule
+from custom_components.pre_hdo.stats import PreHdoStatistics, day_tariff_stats
+
+SAMPLE_PERIODS = [
+    HdoPeriod(tariff="VT", start=time(0, 0), end=time(1, 0)),
+    HdoPeriod(tariff="NT", start=time(1, 0), end=time(6, 0)),
+    HdoPeriod(tariff="VT", start=time(6, 0), end=time(13, 0)),
+    HdoPeriod(tariff="NT", start=time(13, 0), end=time(16, 0)),
+    HdoPeriod(tariff="VT", start=time(16, 0), end=time(0, 0)),
+]
+SAMPLE_SCHEDULE = HdoSchedule.from_periods(SAMPLE_PERIODS)
+
+DAY = date(2024, 1, 15)
+LOW_ID = "pre_hdo:492_low_tariff_minutes"
+
+
+class TestDayTariffStats:
+    def test_totals_and_switches(self) -> None:
+        stats = day_tariff_stats(SAMPLE_SCHEDULE)
+        assert (stats.low_minutes, stats.high_minutes) == (480, 960)
+        assert stats.switches == 4
+        assert stats.last_tariff == "VT"
+
+    def test_adjacent_periods_are_not_switches(self) -> None:
+        schedule = HdoSchedule.from_periods(
+            [
+                HdoPeriod(tariff="NT", start=time(0, 0), end=time(2, 0)),
+                HdoPeriod(tariff="NT", start=time(2, 0), end=time(4, 0)),
+                HdoPeriod(tariff="VT", start=time(4, 0), end=time(0, 0)),
+            ]
+        )
+        assert day_tariff_stats(schedule).switches == 1
+
+    def test_switch_at_midnight(self) -> None:
+        assert day_tariff_stats(SAMPLE_SCHEDULE, "NT").switches == 5
+        assert day_tariff_stats(SAMPLE_SCHEDULE, "VT").switches == 4
+
+
+class TestPreHdoStatistics:
+    """Days are imported once, continuing the last imported sums."""
+
+    async def _import(self, last: dict, days: dict, today: date):
+        recorder = MagicMock()
+        recorder.async_add_executor_job = AsyncMock(
+            side_effect=lambda _func, _hass, _n, statistic_id, *_: (
+                {statistic_id: last[statistic_id]} if statistic_id in last else {}
+            )
+        )
+        statistics = PreHdoStatistics(MagicMock(), "492")
+        with (
+            patch(
+                "custom_components.pre_hdo.stats.get_instance", return_value=recorder
+            ),
+            patch(
+                "custom_components.pre_hdo.stats.async_add_external_statistics"
+            ) as add,
+        ):
+            await statistics.async_import(days, today)
+            await statistics.async_import(days, today)
+        return recorder, add
+
+    async def test_imports_days_up_to_today(self) -> None:
+        days = {DAY + timedelta(days=offset): SAMPLE_SCHEDULE for offset in range(3)}
+        recorder, add = await self._import({}, days, DAY + timedelta(days=1))
+
+        # The last rows are read once, the second call imports nothing
+        assert recorder.async_add_executor_job.await_count == 3
+        assert add.call_count == 3
+        rows = {
+            call.args[1]["statistic_id"]: call.args[2] for call in add.call_args_list
+        }
+        assert [(r["state"], r["sum"]) for r in rows[LOW_ID]] == [
+            (480, 480),
+            (480, 960),
+        ]
+        assert [r["sum"] for r in rows["pre_hdo:492_tariff_switches"]] == [4, 8]
+
+    async def test_continues_after_last_imported_day(self) -> None:
+        start = dt_util.start_of_local_day(DAY).timestamp()
+        last = {LOW_ID: [{"start": start, "sum": 1000.0}]}
+        days = {DAY: SAMPLE_SCHEDULE, DAY + timedelta(days=1): SAMPLE_SCHEDULE}
+        _recorder, add = await self._import(last, days, DAY + timedelta(days=1))
+
+        rows = {
+            call.args[1]["statistic_id"]: call.args[2] for call in add.call_args_list
+        }
+        assert [(r["state"], r["sum"]) for r in rows[LOW_ID]] == [(480, 1480)]
@@ -0,0 +1,29 @@
+"""Tests for the PRE Distribuce schedule cache."""
+
+from datetime import time
+
+from custom_components.pre_hdo.parser import HdoPeriod
+from custom_components.pre_hdo.store import periods_from_storage, periods_to_storage
+
+SAMPLE_PERIODS = [
+    HdoPeriod(tariff="VT", start=time(0, 0), end=time(1, 0)),
+    HdoPeriod(tariff="NT", start=time(1, 0), end=time(6, 0)),
+    HdoPeriod(tariff="VT", start=time(6, 0), end=time(13, 0)),
+    HdoPeriod(tariff="NT", start=time(13, 0), end=time(16, 0)),
+    HdoPeriod(tariff="VT", start=time(16, 0), end=time(0, 0)),
+]
+
+
+class TestScheduleSerialisation:
+    def test_periods_to_storage(self) -> None:
+        stored = periods_to_storage(SAMPLE_PERIODS)
+        assert stored[0] == ["VT", "00:00", "01:00"]
+        assert stored[-1] == ["VT", "16:00", "00:00"]
+
+    def test_round_trip(self) -> None:
+        stored = periods_to_storage(SAMPLE_PERIODS)
+        assert periods_from_storage(stored) == SAMPLE_PERIODS
+
+    def test_empty_schedule(self) -> None:
+        assert periods_to_storage([]) == []
+        assert periods_from_storage([]) == []